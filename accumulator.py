@@ -0,0 +1,120 @@
+import numpy as np
+import itertools
+from stencil import pinv_t, same_matrix
+
+# Incremental assembly of the GSG/GSH/GST from (index, value) records arriving in
+# any order, e.g. from a job queue. The mixed forward difference is linear in the
+# lattice values: a value with all indices > 0 enters the difference tensor
+# directly, and values on the lattice faces (some index 0) enter it with
+# alternating signs, broadcast along the axes where their index is 0. Interior
+# values are therefore written in place as they arrive, the faces are kept in
+# arrays of lower dimension, and the value grid itself is never built.
+
+
+class ValueAccumulator:
+    """
+    Accumulate lattice values one at a time or in chunks and finalize into the
+    GSG (S), GSH (S, T) or GST (S, T, U) with the cached pseudo-inverses.
+
+    Records use the indexing of the *_from_values functions: index (i, j, r)
+    holds f(x0 + s_i + t_j + u_r), index 0 meaning no step along that axis.
+    When direction matrices are identical (e.g. T is S), a record also fills
+    its mirror images, so only one of v[i, j] and v[j, i] needs to be sent.
+    """
+
+    def __init__(self, S, T=None, U=None):
+        mats = [S] + [M for M in (T, U) if M is not None]
+        if U is not None and T is None:
+            raise ValueError("U requires T")
+        self.mats = [np.asarray(M, dtype=float) for M in mats]
+        self.order = len(self.mats)
+        self.shape = tuple(M.shape[1] + 1 for M in self.mats)
+
+        # Axis permutations that only exchange axes with identical direction matrices
+        P = self.order
+        same = [[same_matrix(self.mats[p], self.mats[q]) for q in range(P)] for p in range(P)]
+        self._perms = [perm for perm in itertools.permutations(range(P))
+                       if all(same[p][perm[p]] for p in range(P))]
+
+        # One array per pattern of zero indices; the pattern with no zeros is the
+        # interior, which is the (unsigned) difference tensor itself
+        self._parts = {}
+        self._seen = {}
+        for zeros in itertools.product((False, True), repeat=P):
+            part_shape = tuple(m - 1 for m, z in zip(self.shape, zeros) if not z)
+            self._parts[zeros] = np.zeros(part_shape)
+            self._seen[zeros] = np.zeros(part_shape, dtype=bool)
+
+    def add(self, index, value):
+        """Add the value at one lattice index (a tuple of P ints)."""
+        self.add_many([index], [value])
+
+    def add_many(self, indices, values):
+        """
+        Add a chunk of records.
+        Parameters:
+            indices : array_like (N, P) of int (or (N,) for the GSG)
+                Lattice indices, in any order; a repeated index overwrites.
+            values : array_like (N,)
+                Function values at those indices.
+        """
+        indices = np.asarray(indices, dtype=int).reshape(-1, self.order)
+        values = np.asarray(values, dtype=float).reshape(-1)
+        if len(indices) != len(values):
+            raise ValueError(f"Got {len(indices)} indices and {len(values)} values")
+        if np.any(indices < 0) or np.any(indices >= np.array(self.shape)):
+            raise IndexError(f"Lattice index out of range for lattice shape {self.shape}")
+
+        for perm in self._perms:
+            idx = indices[:, perm]
+            zeros = idx == 0
+            for pattern in np.unique(zeros, axis=0):
+                rows = np.all(zeros == pattern, axis=1)
+                key = tuple(bool(z) for z in pattern)
+                sub = tuple(idx[rows][:, ~pattern].T - 1)
+                if not sub:
+                    # f(x0): a single value, the last record wins
+                    self._parts[key][...] = values[rows][-1]
+                    self._seen[key][...] = True
+                    continue
+                self._parts[key][sub] = values[rows]
+                self._seen[key][sub] = True
+
+    @property
+    def missing(self):
+        """Number of lattice values still required."""
+        return int(sum(np.size(seen) - np.count_nonzero(seen) for seen in self._seen.values()))
+
+    @property
+    def complete(self):
+        return self.missing == 0
+
+    def difference(self):
+        """
+        Mixed forward difference of the lattice values, shape (m[, k[, l]]),
+        equal to v[1:] - v[0] for the GSG and to the second/third mixed
+        differences of gsh_from_values/gst_from_values.
+        """
+        if not self.complete:
+            raise ValueError(f"{self.missing} lattice values are still missing")
+        delta = self._parts[(False,) * self.order].copy()
+        for zeros, part in self._parts.items():
+            if any(zeros):
+                sign = -1.0 if sum(zeros) % 2 else 1.0
+                delta += sign * np.expand_dims(part, tuple(p for p, z in enumerate(zeros) if z))
+        return delta
+
+    def finalize(self):
+        """
+        Contract the difference tensor with the cached pseudo-inverses.
+        Returns:
+            The GSG (n,), GSH (n, n) or GST (n, n, n), scaled as the corresponding
+            *_from_values function.
+        """
+        delta = self.difference()
+        pinvs = [pinv_t(M) for M in self.mats]
+        if self.order == 1:
+            return pinvs[0] @ delta
+        if self.order == 2:
+            return pinvs[0] @ delta @ pinvs[1].T
+        return np.einsum('ai,bj,ck,ijk->abc', *pinvs, delta, optimize=True)
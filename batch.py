@@ -0,0 +1,259 @@
+import numpy as np
+import argparse
+import csv
+import hashlib
+import importlib
+import itertools
+import json
+import os
+import sys
+from gsg import gsg_from_func
+from gsh import gsh_from_func
+from tres import gst_from_func
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "generalized-simplex-derivatives"
+)
+
+# In-process cache: (expression, n) -> compiled entry
+_COMPILED = {}
+
+
+def parse_matrix(matrix):
+    """
+    Parse a direction matrix given either as nested lists or as a string of
+    semicolon-separated rows with space-separated values (e.g. "1 0; 0 1").
+    """
+    if isinstance(matrix, str):
+        rows = matrix.split(';')
+        return np.array([list(map(float, row.strip().split())) for row in rows])
+    return np.array(matrix, dtype=float)
+
+
+def parse_vector(vector):
+    """
+    Parse a point given as a list or as a space/comma-separated string.
+    """
+    if isinstance(vector, str):
+        return np.array(list(map(float, vector.replace(",", " ").split())))
+    return np.array(vector, dtype=float).ravel()
+
+
+def read_jobs(path=None, fmt=None):
+    """
+    Yield jobs (dicts) from a JSONL or CSV file, or from stdin when path is None or "-".
+
+    Recognised fields: function (or expression), x0, h, order, S, T, U, id.
+    """
+    if fmt is None:
+        fmt = "csv" if path and path.lower().endswith(".csv") else "jsonl"
+    stream = sys.stdin if path in (None, "-") else open(path, newline="")
+    try:
+        if fmt == "csv":
+            for row in csv.DictReader(stream):
+                yield {key: value for key, value in row.items() if value not in (None, "")}
+        else:
+            for line in stream:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _cache_path(cache_dir, expression, n):
+    key = hashlib.sha256(f"{n}|{expression}".encode()).hexdigest()
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def _load_entry(cache_dir, expression, n):
+    if cache_dir:
+        try:
+            with open(_cache_path(cache_dir, expression, n)) as fh:
+                entry = json.load(fh)
+            if entry.get("expression") == expression and entry.get("n") == n:
+                return entry
+        except (OSError, ValueError):
+            pass
+    return {"expression": expression, "n": n, "modules": [], "value": None, "derivatives": {}}
+
+
+def _store_entry(cache_dir, entry):
+    if not cache_dir:
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(cache_dir, entry["expression"], entry["n"])
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(entry, fh)
+    os.replace(tmp, path)
+
+
+def _compile(code, n, modules):
+    namespace = {name: importlib.import_module(name) for name in modules}
+    namespace["numpy"] = np
+    args = ", ".join(f"x{i}" for i in range(n))
+    return eval(f"lambda {args}: ({code})", namespace)
+
+
+class _Symbolic:
+    """Lazily created SymPy state for one expression (SymPy is imported on first use)."""
+
+    def __init__(self, expression, n):
+        import sympy as sp
+        from sympy.printing.numpy import NumPyPrinter
+
+        self.sp = sp
+        self.x_syms = sp.symbols(f"x0:{n}")
+        local_dict = {str(x): x for x in self.x_syms}
+        self.f_expr = sp.sympify(expression, locals=local_dict)
+        self.printer = NumPyPrinter({"fully_qualified_modules": True})
+
+    def code(self, expr):
+        return self.printer.doprint(expr)
+
+    def modules(self):
+        return sorted(self.printer.module_imports)
+
+
+def get_compiled(expression, n, orders=(), cache_dir=None):
+    """
+    Return the compiled function and reference derivatives for an expression.
+
+    Lookups go to the in-process cache first, then to the on-disk cache in
+    cache_dir; only on a miss is SymPy imported to parse and differentiate.
+    Derivatives are generated for sorted index tuples only and expanded by symmetry.
+    Returns:
+        entry : dict
+            "fun" -> callable f(x0, ..., x{n-1}); "derivatives" -> {order: callable
+            returning the derivative tensor at a point as an ndarray}.
+    """
+    compiled = _COMPILED.get((expression, n))
+    if compiled is None:
+        compiled = {"source": _load_entry(cache_dir, expression, n), "fun": None, "derivatives": {}}
+        _COMPILED[(expression, n)] = compiled
+    source = compiled["source"]
+
+    missing = [p for p in orders if str(p) not in source["derivatives"]]
+    if source["value"] is None or missing:
+        sym = _Symbolic(expression, n)
+        if source["value"] is None:
+            source["value"] = sym.code(sym.f_expr)
+        for p in missing:
+            indices = list(itertools.combinations_with_replacement(range(n), p))
+            codes = [sym.code(sym.sp.diff(sym.f_expr, *[sym.x_syms[i] for i in idx])) for idx in indices]
+            source["derivatives"][str(p)] = {"indices": indices, "code": codes}
+        source["modules"] = sorted(set(source["modules"]) | set(sym.modules()))
+        _store_entry(cache_dir, source)
+
+    if compiled["fun"] is None:
+        compiled["fun"] = _compile(source["value"], n, source["modules"])
+    for p in orders:
+        if p not in compiled["derivatives"]:
+            compiled["derivatives"][p] = _derivative_evaluator(source["derivatives"][str(p)], n, p, source["modules"])
+    return compiled
+
+
+def _derivative_evaluator(data, n, p, modules):
+    indices = [tuple(idx) for idx in data["indices"]]
+    components = _compile("[" + ", ".join(data["code"]) + "]", n, modules)
+
+    def evaluate(*x0):
+        values = np.array([float(v) for v in components(*x0)])
+        tensor = np.empty((n,) * p)
+        for idx, value in zip(indices, values):
+            for perm in set(itertools.permutations(idx)):
+                tensor[perm] = value
+        return tensor
+
+    return evaluate
+
+
+def run_job(job, cache_dir=None, compare=True):
+    """
+    Run a single job and return its result record.
+    Parameters:
+        job : dict
+            function (or expression), x0, h, order (1, 2 or 3) and optional S, T, U.
+        cache_dir : str or None
+            Directory for the on-disk cache (None disables it).
+        compare : bool
+            Whether to compute the reference derivative and the error.
+    Returns:
+        result : dict
+            JSON-serialisable result record.
+    """
+    expression = str(job.get("function", job.get("expression")))
+    x0 = parse_vector(job["x0"])
+    n = len(x0)
+    h = float(job.get("h", 0.01))
+    order = int(job.get("order", 1))
+    if order not in (1, 2, 3):
+        raise ValueError(f"order must be 1, 2 or 3 (got {order})")
+
+    eye = np.eye(n)
+    S = parse_matrix(job["S"]) if "S" in job else eye
+    T = parse_matrix(job["T"]) if "T" in job else S
+    U = parse_matrix(job["U"]) if "U" in job else T
+
+    compiled = get_compiled(expression, n, (order,) if compare else (), cache_dir)
+    f_func = compiled["fun"]
+    if order == 1:
+        estimate = gsg_from_func(f_func, x0, S, h)
+    elif order == 2:
+        estimate = gsh_from_func(f_func, x0, S, T, h)
+    else:
+        estimate = gst_from_func(f_func, x0, S, T, U, h)
+
+    result = {"function": expression, "x0": x0.tolist(), "h": h, "order": order,
+              "estimate": estimate.tolist()}
+    if "id" in job:
+        result = {"id": job["id"], **result}
+    if compare:
+        true = compiled["derivatives"][order](*x0)
+        result["true"] = true.tolist()
+        result["max_abs_error"] = float(np.max(np.abs(estimate - true)))
+    return result
+
+
+def run_batch(jobs, out=sys.stdout, cache_dir=None, compare=True):
+    """
+    Run jobs and stream one JSON line per job to out. A failing job produces
+    an {"error": ...} record instead of stopping the batch.
+    """
+    for line_no, job in enumerate(jobs, start=1):
+        try:
+            result = run_job(job, cache_dir=cache_dir, compare=compare)
+        except Exception as e:
+            result = {"job": line_no, "error": f"{type(e).__name__}: {e}"}
+            if isinstance(job, dict) and "id" in job:
+                result["id"] = job["id"]
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Batch GSG/GSH/GST estimation: reads jobs from JSONL/CSV (or stdin) and writes JSON lines."
+    )
+    parser.add_argument("jobs", nargs="?", default="-", help="Job file (.jsonl or .csv); '-' or omitted reads stdin")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="Input format (default: from file extension, else jsonl)")
+    parser.add_argument("--output", type=str, help="Write results to this file instead of stdout")
+    parser.add_argument("--cache-dir", type=str, default=os.environ.get("GSD_CACHE_DIR", DEFAULT_CACHE_DIR),
+                        help="Directory for compiled-function cache")
+    parser.add_argument("--no-disk-cache", action="store_true", help="Keep the cache in memory only")
+    parser.add_argument("--no-compare", action="store_true", help="Skip reference derivatives and errors")
+    args = parser.parse_args()
+
+    cache_dir = None if args.no_disk_cache else args.cache_dir
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        run_batch(read_jobs(args.jobs, args.format), out=out, cache_dir=cache_dir, compare=not args.no_compare)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
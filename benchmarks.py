@@ -0,0 +1,320 @@
+import numpy as np
+from collections import namedtuple
+
+# Library of standard test functions with closed-form derivatives, so the
+# estimators can be validated without SymPy. Every callable follows the
+# convention used by the estimators: f(*x) with x = (x0, ..., x{n-1}).
+# Function values also accept array coordinates (x_i of shape (N,)) and
+# then return N values; derivatives are evaluated at a single point.
+# third returns the dense (n, n, n) tensor, so it is only practical for moderate
+# n; third_max gives max |D^3 f(x)_ijk| from the sparse structure in O(n) to
+# O(n^2) memory, which is all the Lipschitz-based error bounds need.
+
+Benchmark = namedtuple("Benchmark", ["name", "f", "grad", "hess", "third", "third_max", "x0", "valid_n"])
+
+
+def _point(x):
+    return np.asarray(np.broadcast_arrays(*x), dtype=float)
+
+
+# --- Rosenbrock: sum_i 100 (x_{i+1} - x_i^2)^2 + (1 - x_i)^2 -----------------
+
+def rosenbrock(*x):
+    x = _point(x)
+    return np.sum(100.0 * (x[1:] - x[:-1] ** 2) ** 2 + (1.0 - x[:-1]) ** 2, axis=0)
+
+
+def rosenbrock_grad(*x):
+    x = _point(x)
+    g = np.zeros_like(x)
+    r = x[1:] - x[:-1] ** 2
+    g[:-1] = -400.0 * x[:-1] * r - 2.0 * (1.0 - x[:-1])
+    g[1:] += 200.0 * r
+    return g
+
+
+def rosenbrock_hess(*x):
+    x = _point(x)
+    n = len(x)
+    H = np.zeros((n, n))
+    idx = np.arange(n - 1)
+    H[idx, idx] = 1200.0 * x[:-1] ** 2 - 400.0 * x[1:] + 2.0
+    H[idx + 1, idx + 1] += 200.0
+    H[idx, idx + 1] = H[idx + 1, idx] = -400.0 * x[:-1]
+    return H
+
+
+def rosenbrock_third(*x):
+    x = _point(x)
+    n = len(x)
+    D = np.zeros((n, n, n))
+    idx = np.arange(n - 1)
+    D[idx, idx, idx] = 2400.0 * x[:-1]
+    D[idx, idx, idx + 1] = D[idx, idx + 1, idx] = D[idx + 1, idx, idx] = -400.0
+    return D
+
+
+def rosenbrock_third_max(*x):
+    x = _point(x)
+    return max(400.0, float(np.max(np.abs(2400.0 * x[:-1]))))
+
+
+# --- Extended quartic: sum_i (i+1) x_i^4 -------------------------------------
+
+def _weights(n):
+    return np.arange(1, n + 1, dtype=float)
+
+
+def quartic(*x):
+    x = _point(x)
+    w = _weights(len(x)).reshape((-1,) + (1,) * (x.ndim - 1))
+    return np.sum(w * x ** 4, axis=0)
+
+
+def quartic_grad(*x):
+    x = _point(x)
+    return 4.0 * _weights(len(x)) * x ** 3
+
+
+def quartic_hess(*x):
+    x = _point(x)
+    return np.diag(12.0 * _weights(len(x)) * x ** 2)
+
+
+def quartic_third(*x):
+    x = _point(x)
+    n = len(x)
+    D = np.zeros((n, n, n))
+    idx = np.arange(n)
+    D[idx, idx, idx] = 24.0 * _weights(n) * x
+    return D
+
+
+def quartic_third_max(*x):
+    x = _point(x)
+    return float(np.max(np.abs(24.0 * _weights(len(x)) * x)))
+
+
+# --- Trigonometric (More, Garbow & Hillstrom):
+#     sum_i r_i^2,  r_i = n - sum_j cos x_j + (i+1)(1 - cos x_i) - sin x_i ---------
+
+def _trig_terms(x):
+    n = len(x)
+    w = _weights(n)
+    s, c = np.sin(x), np.cos(x)
+    r = n - np.sum(c) + w * (1.0 - c) - s
+    a = w * s - c   # dr_i/dx_i beyond the common sin x_i term
+    b = w * c + s   # d2r_i/dx_i^2 beyond the common cos x_i term
+    return n, s, c, r, a, b
+
+
+def trigonometric(*x):
+    x = _point(x)
+    n = len(x)
+    w = _weights(n).reshape((-1,) + (1,) * (x.ndim - 1))
+    c = np.cos(x)
+    r = n - np.sum(c, axis=0) + w * (1.0 - c) - np.sin(x)
+    return np.sum(r ** 2, axis=0)
+
+
+def trigonometric_grad(*x):
+    n, s, c, r, a, b = _trig_terms(_point(x))
+    return 2.0 * (s * np.sum(r) + a * r)
+
+
+def trigonometric_hess(*x):
+    n, s, c, r, a, b = _trig_terms(_point(x))
+    # J = 1 s^T + diag(a); J^T J = n s s^T + s a^T + a s^T + diag(a^2)
+    H = n * np.outer(s, s) + np.outer(s, a) + np.outer(a, s)
+    H[np.diag_indices(n)] += a ** 2 + np.sum(r) * c + r * b
+    return 2.0 * H
+
+
+def trigonometric_third(*x):
+    n, s, c, r, a, b = _trig_terms(_point(x))
+    g = n * s + a   # column sums of J
+    # A[k, l] = sum_i J_ik r_i,ll  (second derivatives of r_i are diagonal)
+    A = np.outer(g, c) + np.outer(s, b)
+    A[np.diag_indices(n)] += a * b
+    idx = np.arange(n)
+    D = np.zeros((n, n, n))
+    D[:, idx, idx] += A
+    D[idx, :, idx] += A.T
+    D[idx, idx, :] += A.T
+    D[idx, idx, idx] -= np.sum(r) * s + r * a
+    return 2.0 * D
+
+
+def trigonometric_third_max(*x):
+    n, s, c, r, a, b = _trig_terms(_point(x))
+    g = n * s + a
+    A = np.outer(g, c) + np.outer(s, b)
+    A[np.diag_indices(n)] += a * b
+    # Entries with two equal indices are 2 A[k, l]; the diagonal collects three terms
+    diag = 3.0 * np.diag(A) - (np.sum(r) * s + r * a)
+    np.fill_diagonal(A, 0.0)
+    return 2.0 * max(float(np.max(np.abs(A))), float(np.max(np.abs(diag))))
+
+
+# --- Extended Powell singular (n a multiple of 4) ----------------------------
+# Each block contributes (x1 + 10 x2)^2 + 5 (x3 - x4)^2 + (x2 - 2 x3)^4 + 10 (x1 - x4)^4,
+# i.e. a sum of ridge terms c (w . x)^p whose derivatives are c p ... (w . x)^(p-d) w^(x)d.
+
+_POWELL_BLOCK = (
+    (1.0, 2, (1.0, 10.0, 0.0, 0.0)),
+    (5.0, 2, (0.0, 0.0, 1.0, -1.0)),
+    (1.0, 4, (0.0, 1.0, -2.0, 0.0)),
+    (10.0, 4, (1.0, 0.0, 0.0, -1.0)),
+)
+
+
+def _powell_ridges(n):
+    if n % 4:
+        raise ValueError(f"Powell function requires n to be a multiple of 4 (got {n})")
+    blocks = n // 4
+    W = np.zeros((4 * blocks, n))
+    coef = np.tile([c for c, _, _ in _POWELL_BLOCK], blocks)
+    power = np.tile([p for _, p, _ in _POWELL_BLOCK], blocks)
+    for b in range(blocks):
+        for t, (_, _, w) in enumerate(_POWELL_BLOCK):
+            W[4 * b + t, 4 * b:4 * b + 4] = w
+    return W, coef, power
+
+
+def powell(*x):
+    x = _point(x)
+    W, coef, power = _powell_ridges(len(x))
+    z = np.tensordot(W, x, axes=1)
+    return np.tensordot(coef, z ** power.reshape((-1,) + (1,) * (z.ndim - 1)), axes=1)
+
+
+def powell_grad(*x):
+    x = _point(x)
+    W, coef, power = _powell_ridges(len(x))
+    z = W @ x
+    return W.T @ (coef * power * z ** (power - 1))
+
+
+def powell_hess(*x):
+    x = _point(x)
+    W, coef, power = _powell_ridges(len(x))
+    z = W @ x
+    d = coef * power * (power - 1) * z ** (power - 2)
+    return (W.T * d) @ W
+
+
+def _powell_third_blocks(x):
+    # The ridges of block b act only on coordinates 4b..4b+3, so D^3 f is block
+    # diagonal with (blocks, 4, 4, 4) nonzero entries
+    W, coef, power = _powell_ridges(len(x))
+    z = W @ x
+    d = (coef * power * (power - 1) * (power - 2) * z ** np.maximum(power - 3, 0)).reshape(-1, 4)
+    block = W[:4, :4]
+    return np.einsum("bt,ti,tj,tk->bijk", d, block, block, block, optimize=True)
+
+
+def powell_third(*x):
+    x = _point(x)
+    blocks = _powell_third_blocks(x)
+    B = len(blocks)
+    third = np.zeros((len(x),) * 3)
+    diag = np.arange(B)
+    third.reshape(B, 4, B, 4, B, 4)[diag, :, diag, :, diag, :] = blocks
+    return third
+
+
+def powell_third_max(*x):
+    return float(np.max(np.abs(_powell_third_blocks(_point(x)))))
+
+
+# --- Quadratic form: 0.5 x^T A x + b^T x (A tridiagonal 2, -1 by default) ----
+
+def _tridiagonal(n):
+    return 2.0 * np.eye(n) - np.eye(n, k=1) - np.eye(n, k=-1)
+
+
+def quadratic_form(A=None, b=None):
+    """
+    Build the quadratic benchmark f(x) = 0.5 x^T A x + b^T x.
+    Parameters:
+        A : ndarray (n, n) or None
+            Symmetric matrix (default: tridiagonal with 2 on the diagonal, -1 off it,
+            built for whatever n the function is called with).
+        b : ndarray (n,) or None
+            Linear term (default zero).
+    Returns:
+        Benchmark
+    """
+    def _A(n):
+        return _tridiagonal(n) if A is None else np.asarray(A, dtype=float)
+
+    def _b(n):
+        return np.zeros(n) if b is None else np.asarray(b, dtype=float)
+
+    def f(*x):
+        x = _point(x)
+        M, v = _A(len(x)), _b(len(x))
+        return 0.5 * np.sum(x * np.tensordot(M, x, axes=1), axis=0) + np.tensordot(v, x, axes=1)
+
+    def grad(*x):
+        x = _point(x)
+        return _A(len(x)) @ x + _b(len(x))
+
+    def hess(*x):
+        return _A(len(x)).copy()
+
+    def third(*x):
+        n = len(x)
+        return np.zeros((n, n, n))
+
+    def third_max(*x):
+        return 0.0
+
+    valid_n = (lambda n: n >= 1) if A is None else (lambda n: n == len(A))
+    return Benchmark("quadratic", f, grad, hess, third, third_max, np.ones, valid_n)
+
+
+BENCHMARKS = {
+    "rosenbrock": Benchmark("rosenbrock", rosenbrock, rosenbrock_grad, rosenbrock_hess, rosenbrock_third,
+                            rosenbrock_third_max,
+                            lambda n: np.where(np.arange(n) % 2 == 0, -1.2, 1.0), lambda n: n >= 2),
+    "quartic": Benchmark("quartic", quartic, quartic_grad, quartic_hess, quartic_third, quartic_third_max,
+                         np.ones, lambda n: n >= 1),
+    "trigonometric": Benchmark("trigonometric", trigonometric, trigonometric_grad, trigonometric_hess,
+                               trigonometric_third, trigonometric_third_max,
+                               lambda n: np.full(n, 1.0 / n), lambda n: n >= 1),
+    "powell": Benchmark("powell", powell, powell_grad, powell_hess, powell_third, powell_third_max,
+                        lambda n: np.tile([3.0, -1.0, 0.0, 1.0], n // 4), lambda n: n >= 4 and n % 4 == 0),
+    "quadratic": quadratic_form(),
+}
+
+
+def get_benchmark(name):
+    """
+    Look up a benchmark function by name (see BENCHMARKS).
+    Returns:
+        Benchmark namedtuple with fields name, f, grad, hess, third, third_max, x0,
+        valid_n. x0(n) gives the standard starting point in R^n; third_max(*x) is
+        max |third(*x)| without building the dense tensor.
+    """
+    try:
+        return BENCHMARKS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown benchmark '{name}' (available: {', '.join(sorted(BENCHMARKS))})") from None
+
+
+def benchmark_point(bench, n, x0=None):
+    """
+    Resolve the base point for a benchmark: x0 if given (a single value is
+    repeated n times), otherwise the benchmark's standard starting point.
+    """
+    if x0 is None or len(x0) == 0:
+        if n is None:
+            raise ValueError("Either x0 or the dimension n must be given")
+        x0 = bench.x0(n)
+    elif len(x0) == 1 and n is not None:
+        x0 = np.full(n, float(x0[0]))
+    x0 = np.asarray(x0, dtype=float)
+    if not bench.valid_n(len(x0)):
+        raise ValueError(f"Benchmark '{bench.name}' is not defined for n = {len(x0)}")
+    return x0
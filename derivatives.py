@@ -0,0 +1,93 @@
+import numpy as np
+from stencil import lattice_values, EvaluationCache
+from directions import as_direction_matrix
+from gsg import gsg_from_values
+from gsh import gsh_from_values
+from tres import gst_from_values
+
+def simplex_derivatives(fun, x0, S, T=None, U=None, h=0.01, orders=(1, 2, 3), vectorized=False, workers=None,
+                        cache=None):
+    """
+    Compute the GSG, GSH and GST at x0 from a single evaluation lattice.
+
+    The lattice for the highest requested order contains the lattices of the
+    lower orders: f(x0 + h s_i) are the points v[i, 0, 0] and f(x0 + h s_i + h t_j)
+    are v[i, j, 0]. Every point is evaluated once and each order is computed from
+    a slice of the same value tensor, sharing the cached pseudo-inverses of S, T, U.
+
+    Parameters:
+        fun : callable
+            Scalar function f: R^n -> R, called as fun(*x).
+        x0 : ndarray (n,)
+            Base point.
+        S, T, U : ndarray (n, m), (n, k), (n, l)
+            Normalized direction matrices or set names from directions.DIRECTION_SETS
+            (T defaults to S, U to T).
+        h : float, optional
+            Step size (default 0.01).
+        orders : iterable of int, optional
+            Derivative orders to return, any of 1, 2, 3 (default all).
+        vectorized, workers : see gsg_from_func.
+        cache : stencil.EvaluationCache or None, optional
+            Reuse values of lattice points evaluated by earlier calls.
+    Returns:
+        layers : dict
+            order -> derivative estimate (gradient, Hessian, Tressian).
+    """
+    orders = sorted(set(orders))
+    if not orders or not set(orders) <= {1, 2, 3}:
+        raise ValueError(f"orders must be a non-empty subset of (1, 2, 3) (got {orders})")
+    n = len(np.asarray(x0))
+    S = as_direction_matrix(S, n)
+    T = S if T is None else as_direction_matrix(T, n)
+    U = T if U is None else as_direction_matrix(U, n)
+    P = orders[-1]
+
+    v = lattice_values(fun, x0, [S, T, U][:P], h, vectorized=vectorized, workers=workers, cache=cache)
+
+    layers = {}
+    if 1 in orders:
+        layers[1] = gsg_from_values(v[(slice(None),) + (0,) * (P - 1)], S) / h
+    if 2 in orders:
+        layers[2] = gsh_from_values(v[(slice(None), slice(None)) + (0,) * (P - 2)], S, T) / h**2
+    if 3 in orders:
+        layers[3] = gst_from_values(v, S, T, U) / h**3
+    return layers
+
+
+def trajectory_derivatives(fun, points, S, T=None, U=None, h=0.01, orders=(1,), window=100000, resolution=None,
+                           vectorized=False, workers=None, cache=None):
+    """
+    Lazily estimate derivatives along a stream of base points (e.g. the iterates
+    of an optimizer or the steps of a path-following method).
+
+    Function values are kept in a sliding window of recent evaluations shared by
+    all base points, so a stencil point already evaluated for an earlier base point
+    is never evaluated again: when successive points differ by h s_i (a step along
+    one of the directions) most of the new lattice is already known. The
+    pseudo-inverses of S, T, U are factorized once for the whole stream.
+
+    Parameters:
+        fun : callable
+            Scalar function f: R^n -> R, called as fun(*x).
+        points : iterable of ndarray (n,)
+            Base points; consumed one at a time, so it may be a generator.
+        S, T, U, h, orders : see simplex_derivatives (orders default to the GSG only).
+        window : int, optional
+            Number of function values kept for reuse (default 100000).
+        resolution : float or None, optional
+            Coordinates closer than this are treated as the same point
+            (default 1e-7 h, far below the spacing of distinct stencil points).
+        vectorized, workers : see gsg_from_func.
+        cache : stencil.EvaluationCache or None, optional
+            Cache to use instead of a new one built from window and resolution,
+            e.g. to share it between streams or read its hits/misses counters.
+    Yields:
+        layers : dict
+            order -> derivative estimate at each base point, as simplex_derivatives.
+    """
+    if cache is None:
+        cache = EvaluationCache(window, 1e-7 * h if resolution is None else resolution)
+    for x0 in points:
+        yield simplex_derivatives(fun, np.asarray(x0, dtype=float), S, T, U, h, orders,
+                                  vectorized=vectorized, workers=workers, cache=cache)
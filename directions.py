@@ -0,0 +1,135 @@
+import numpy as np
+from collections import namedtuple
+from functools import lru_cache
+from math import comb
+from stencil import pinv_t, singular_values
+
+# Catalogue of direction sets with unit-norm columns. Each set is built once per
+# (name, n) together with its pseudo-inverse and conditioning data, and can be
+# passed to the estimators by name instead of an explicit matrix.
+
+DirectionSet = namedtuple("DirectionSet", ["name", "S", "S_pinv", "cond", "sigma_min", "sigma_max"])
+
+
+def coordinate(n):
+    """Coordinate directions e_1, ..., e_n (m = n)."""
+    return np.eye(n)
+
+
+def minimal_positive_basis(n):
+    """
+    The n+1 unit vectors from the centroid to the vertices of a regular simplex
+    (m = n+1): they sum to zero and every pair makes the angle arccos(-1/n).
+    """
+    # Vertices e_1..e_{n+1} of R^{n+1}, centred and expressed in an orthonormal
+    # basis of the hyperplane orthogonal to (1, ..., 1)
+    E = np.eye(n + 1) - 1.0 / (n + 1)
+    Q, _ = np.linalg.qr(E[:, :n])
+    U = Q.T @ E
+    return U / np.linalg.norm(U, axis=0)
+
+
+def regular_simplex(n):
+    """
+    Edges from one vertex of a regular simplex to the other n vertices (m = n),
+    so x0 and the n stencil points form a regular simplex; pairwise angles are 60 degrees.
+    """
+    U = minimal_positive_basis(n)
+    D = U[:, 1:] - U[:, :1]
+    return D / np.linalg.norm(D, axis=0)
+
+
+def orthogonal(n):
+    """
+    Dense orthonormal design (m = n): the orthonormal DCT-II basis, so every
+    direction moves all coordinates.
+    """
+    k = np.arange(n)[:, None]
+    j = np.arange(n)[None, :]
+    C = np.sqrt(2.0 / n) * np.cos(np.pi * (j + 0.5) * k / n)
+    C[0] /= np.sqrt(2.0)
+    return C.T
+
+
+def symmetric(n):
+    """Symmetric pairs +e_i, -e_i (m = 2n), the maximal positive basis."""
+    return np.hstack([np.eye(n), -np.eye(n)])
+
+
+DIRECTION_SETS = {
+    "coordinate": coordinate,
+    "minimal_positive_basis": minimal_positive_basis,
+    "regular_simplex": regular_simplex,
+    "orthogonal": orthogonal,
+    "symmetric": symmetric,
+}
+
+
+@lru_cache(maxsize=64)
+def get_direction_set(name, n):
+    """
+    Build (once) the named direction set in R^n with its precomputed data.
+    Parameters:
+        name : str
+            One of DIRECTION_SETS.
+        n : int
+            Dimension.
+    Returns:
+        DirectionSet namedtuple:
+            S (n, m) read-only matrix with unit columns, S_pinv = pinv(S.T) (the
+            same array the estimators' cache returns), cond = sigma_max / sigma_min
+            of S, sigma_min, sigma_max.
+    """
+    try:
+        build = DIRECTION_SETS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown direction set '{name}' (available: {', '.join(sorted(DIRECTION_SETS))})") from None
+    S = np.ascontiguousarray(build(n), dtype=float)
+    S.setflags(write=False)
+    sigma = singular_values(S)  # also the conditioning data used by solver="auto"
+    return DirectionSet(name.lower(), S, pinv_t(S), sigma[0] / sigma[-1], sigma[-1], sigma[0])
+
+
+def as_direction_matrix(S, n):
+    """
+    Resolve a direction argument: a catalogue name becomes its matrix in R^n,
+    anything else is converted to a float array.
+    """
+    if isinstance(S, str):
+        return get_direction_set(S, n).S
+    return np.asarray(S, dtype=float)
+
+
+def lattice_size(m, order):
+    """
+    Distinct function evaluations for an order-P stencil using the same m
+    directions on every axis (points repeated by symmetry counted once):
+    C(m + P, P), i.e. m+1 for the GSG.
+    """
+    return comb(m + order, order)
+
+
+def select_direction_set(n, order=1, budget=None, max_cond=10.0):
+    """
+    Pick the cheapest well-conditioned direction set for an evaluation budget.
+    Parameters:
+        n : int
+            Dimension.
+        order : int, optional
+            Derivative order (1 GSG, 2 GSH, 3 GST) with the same set on every axis.
+        budget : int or None, optional
+            Maximum number of function evaluations (default unlimited).
+        max_cond : float, optional
+            Largest acceptable condition number of S (default 10).
+    Returns:
+        DirectionSet with the fewest evaluations (ties broken by conditioning).
+    """
+    candidates = []
+    for name in DIRECTION_SETS:
+        ds = get_direction_set(name, n)
+        cost = lattice_size(ds.S.shape[1], order)
+        if ds.cond <= max_cond and (budget is None or cost <= budget):
+            candidates.append((cost, ds.cond, name, ds))
+    if not candidates:
+        raise ValueError(f"No direction set for n = {n}, order {order} within budget {budget} and cond <= {max_cond}")
+    return min(candidates)[3]
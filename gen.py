@@ -1,15 +1,34 @@
 import numpy as np
+from contextlib import nullcontext
+from stencil import output_array, default_chunk_size, lattice_values, scratch_file, pinv_t
 
 
-def generate_simplex_derivative(f, x0, S_list, h_list):
+def generate_simplex_derivative(f, x0, S_list, h_list, out=None, chunk_size=None, scheme="forward"):
     """
     Compute simplex derivatives up to order P.
     Returns a dict: order -> derivative tensor.
+
+    With out (path of a .npy file, or an array such as an np.memmap) the order-P
+    tensor is written there out of core: the m1 lower-order differences are kept
+    in a temporary memory-mapped file and contracted in chunks of chunk_size rows
+    of the leading index (default: about 64 MB per chunk).
+
+    scheme="centered" uses the symmetric differences
+    sum over signs of (prod sigma_p) f(x0 + sum_p sigma_p h_p s_p) / prod(2 h_p),
+    which are second-order accurate in h. All orders are taken from one shared
+    +/- lattice, so every point is evaluated once.
     """
+    if scheme == "centered":
+        return _centered_simplex_derivatives(f, x0, S_list, h_list, out, chunk_size)
+    if scheme != "forward":
+        raise ValueError(f"Unknown scheme '{scheme}' (expected 'forward' or 'centered')")
     P = len(S_list)
     layers = {}
     for p in range(1, P + 1):
-        layers[p] = _simplex_derivative_order_p(f, x0, S_list[:p], h_list[:p])
+        if p == P and (out is not None or chunk_size is not None):
+            layers[p] = _simplex_derivative_order_p_chunked(f, x0, S_list[:p], h_list[:p], out, chunk_size)
+        else:
+            layers[p] = _simplex_derivative_order_p(f, x0, S_list[:p], h_list[:p])
     return layers
 
 
@@ -29,18 +48,110 @@ def _simplex_derivative_order_p(f, x0, S_sub, h_sub):
         deltas.append((lower - base) / h1)  # <-- divide by h1 here!
 
     delta_arr = np.stack(deltas, axis=0)  # shape: (m1, ...)
-    pinv = np.linalg.pinv(S1.T)  # shape: (n, m1)
+    pinv = pinv_t(S1)  # shape: (n, m1)
     # Fold pinv into first axis of delta_arr
     return np.tensordot(pinv, delta_arr, axes=[1, 0])
 
 
+def _simplex_derivative_order_p_chunked(f, x0, S_sub, h_sub, out, chunk_size):
+    S1 = S_sub[0]
+    h1 = h_sub[0]
+    if len(S_sub) == 1:
+        # Order 1: the rows are the forward differences of f itself
+        lower_order = lambda x: np.asarray(f(x), dtype=float)
+    else:
+        lower_order = lambda x: _simplex_derivative_order_p(f, x, S_sub[1:], h_sub[1:])
+    base = lower_order(x0)
+    m1 = S1.shape[1]
+    n = len(x0)
+    row_size = base.size
+    if chunk_size is None:
+        chunk_size = default_chunk_size(row_size)
+
+    with scratch_file(out) as deltas_path:
+        deltas = np.lib.format.open_memmap(deltas_path, mode="w+", dtype=float, shape=(m1, row_size))
+        for j in range(m1):
+            xj = x0 + h1 * S1[:, j]
+            deltas[j] = ((lower_order(xj) - base) / h1).ravel()
+
+        pinv = pinv_t(S1)  # shape: (n, m1)
+        result = output_array(out, (n,) + base.shape)
+        flat = result.reshape(n, row_size)
+        for a0 in range(0, n, chunk_size):
+            a1 = min(a0 + chunk_size, n)
+            acc = np.zeros((a1 - a0, row_size))
+            for j0 in range(0, m1, chunk_size):
+                j1 = min(j0 + chunk_size, m1)
+                acc += pinv[a0:a1, j0:j1] @ deltas[j0:j1]
+            flat[a0:a1] = acc
+        if isinstance(result, np.memmap):
+            result.flush()
+        del deltas, flat
+    return result
+
+
+def _centered_simplex_derivatives(f, x0, S_list, h_list, out, chunk_size):
+    x0 = np.asarray(x0, dtype=float)
+    P = len(S_list)
+    # Lattice axis p holds [0, +h_p S_p, -h_p S_p]; order p uses the entries whose
+    # trailing P - p indices are 0, so the lower orders reuse the same values.
+    # lattice_values evaluates permuted and cancelling (+h s_i - h s_i) steps of
+    # axes with equal S and h once.
+    mats = [h * np.hstack([S, -S]) for S, h in zip(S_list, h_list)]
+    fun = lambda *x: f(np.array(x))
+
+    # The value lattice is memory-mapped only in out-of-core mode
+    with scratch_file(out) if out is not None else nullcontext() as values_path:
+        v = lattice_values(fun, x0, mats, 1.0, out=values_path)
+        layers = {}
+        for p in range(1, P + 1):
+            layers[p] = _centered_layer(v, S_list[:p], h_list[:p], out if p == P else None,
+                                        chunk_size if p == P else None)
+        del v
+    return layers
+
+
+def _centered_layer(v, S_sub, h_sub, out, chunk_size):
+    p = len(S_sub)
+    P = v.ndim
+    m = [S.shape[1] for S in S_sub]
+    n = S_sub[0].shape[0]
+    pinvs = [pinv_t(S) for S in S_sub]
+    scale = 1.0 / np.prod([2.0 * h for h in h_sub])
+    rest = (0,) * (P - p)
+
+    def centered_rows(i0, i1):
+        # Centered differences for rows i0:i1 of the leading axis
+        plus = np.asarray(v[(slice(1 + i0, 1 + i1),) + (slice(None),) * (p - 1) + rest], dtype=float)
+        minus = np.asarray(v[(slice(1 + m[0] + i0, 1 + m[0] + i1),) + (slice(None),) * (p - 1) + rest], dtype=float)
+        D = plus - minus
+        for axis in range(1, p):
+            D = np.take(D, range(1, 1 + m[axis]), axis=axis) - np.take(D, range(1 + m[axis], 1 + 2 * m[axis]), axis=axis)
+        return D
+
+    if chunk_size is None:
+        chunk_size = default_chunk_size(n ** (p - 1)) if out is not None else n
+    result = output_array(out, (n,) * p)
+    for a0 in range(0, n, chunk_size):
+        a1 = min(a0 + chunk_size, n)
+        acc = 0.0
+        for i0 in range(0, m[0], chunk_size):
+            i1 = min(i0 + chunk_size, m[0])
+            acc = acc + np.tensordot(pinvs[0][a0:a1, i0:i1], centered_rows(i0, i1), axes=1)
+        for axis in range(1, p):
+            acc = np.moveaxis(np.tensordot(pinvs[axis], acc, axes=([1], [axis])), 0, axis)
+        result[a0:a1] = scale * acc
+    if isinstance(result, np.memmap):
+        result.flush()
+    return result
+
+
 def _gsg(f, x0, S1, h1):
     m1 = S1.shape[1]
     f0 = f(x0)
     vals = np.array([f(x0 + h1 * S1[:, j]) for j in range(m1)])
     diffs = (vals - f0) / h1
-    pinv = np.linalg.pinv(S1.T)
-    grad = pinv.dot(diffs)
+    grad = pinv_t(S1).dot(diffs)
     return grad
 
 
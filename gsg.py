@@ -1,7 +1,8 @@
 import numpy as np
-import sympy as sp
+from stencil import lattice_values, evaluate_points, contract_t
+from directions import as_direction_matrix
 
-def gsg_from_func(fun, x0, S, h=0.01):
+def gsg_from_func(fun, x0, S, h=0.01, vectorized=False, workers=None, solver="pinv", return_info=False):
     """
     Compute the Generalized Simplex Gradient (GSG) using a function.
     Parameters:
@@ -10,25 +11,31 @@ def gsg_from_func(fun, x0, S, h=0.01):
         x0 : numpy array
             Point in R^n.
         S : numpy array, shape (n, m)
-            Normalized direction matrix (columns have norm 1).
+            Normalized direction matrix (columns have norm 1), or the name of
+            a set from directions.DIRECTION_SETS (e.g. "regular_simplex").
         h : float, optional
             Step size (default 0.01).
+        vectorized : bool, optional
+            Call fun once per batch of points with array coordinates (default False).
+        workers : int or None, optional
+            Number of worker processes for the evaluations (default in-process).
+        solver : str, optional
+            Least-squares backend: "pinv" (default), "lstsq", "cholesky", "svd"
+            or "auto", see stencil.solve_t.
+        return_info : bool, optional
+            Also return the solver report (solver used, cond(S), residual).
     Returns:
         grad : numpy array, shape (n,)
             Gradient estimate.
+        info : dict, only with return_info=True
     """
     x0 = np.asarray(x0, dtype=float)
-    S = np.asarray(S, dtype=float)
-    n, m = S.shape
-    v = [fun(*x0)]
-    for i in range(m):
-        v.append(fun(*(x0 + h * S[:, i])))
-    v = np.array(v)
+    S = as_direction_matrix(S, len(x0))
+    v = lattice_values(fun, x0, [S], h, vectorized=vectorized, workers=workers)
     delta_s = (v[1:] - v[0]) / h
-    grad = np.linalg.pinv(S.T) @ delta_s
-    return grad
+    return contract_t(delta_s, [S], solver, return_info)
 
-def gsg_from_values(v, S):
+def gsg_from_values(v, S, solver="pinv", return_info=False):
     """
     Compute the Generalized Simplex Gradient (GSG) using only function values.
     Parameters:
@@ -36,18 +43,19 @@ def gsg_from_values(v, S):
             v[0] = f(x0), v[1] = f(x0 + s1), ..., v[m] = f(x0 + sm).
         S : numpy array, shape (n, m)
             Columns are the direction vectors s1, ..., sm.
+        solver, return_info : see gsg_from_func.
     Returns:
         grad : numpy array, shape (n,)
             Gradient estimate.
+        info : dict, only with return_info=True
     """
     v = np.asarray(v, dtype=float)
     S = np.asarray(S, dtype=float)
-    n, m = S.shape
+    m = S.shape[1]
     if v.shape[0] != m + 1:
         raise ValueError(f"v must have length m+1 (got {v.shape[0]}, expected {m+1})")
     delta_s = v[1:] - v[0]
-    grad = np.linalg.pinv(S.T) @ delta_s
-    return grad
+    return contract_t(delta_s, [S], solver, return_info)
 
 def gsg_error_bound(x0, S, hess_func):
     """
@@ -63,18 +71,7 @@ def gsg_error_bound(x0, S, hess_func):
         bound : float
             Estimated error bound.
     """
-    x0 = np.asarray(x0, dtype=float)
-    S = np.asarray(S, dtype=float)
-    n, m = S.shape
-    H = np.array(hess_func(*x0))  # shape (n, n)
-    quad_forms = []
-    for i in range(m):
-        s = S[:, i]
-        q = np.abs(s @ H @ s)
-        quad_forms.append(q)
-    max_quad = max(quad_forms)
-    max_norm = max(np.linalg.norm(S[:, i]) for i in range(m))
-    return 0.5 * max_quad / max_norm
+    return 0.5 * float(curvature_constants(np.asarray(x0, dtype=float)[None, :], S, hess_func)[0])
 
 def gsg_error_bound_lipschitz(m, h, L):
     """
@@ -106,16 +103,105 @@ def estimate_lipschitz_from_gradients(x0, S, grad_func):
         L : float
             Estimated Lipschitz constant.
     """
-    x0 = np.asarray(x0, dtype=float)
+    return float(lipschitz_constants(np.asarray(x0, dtype=float)[None, :], S, grad_func)[0])
+
+def curvature_constants(X, S, hess_func, vectorized=False, workers=None):
+    """
+    Largest curvature along the directions, max_i |s_i^T H(x) s_i| / max_i ||s_i||,
+    at a stack of points (gsg_error_bound is half this constant).
+    Parameters:
+        X : ndarray (N, n)
+            Points.
+        S : ndarray (n, m)
+            Direction matrix.
+        hess_func : callable
+            Hessian, called as hess_func(*x). With vectorized=True it is called once
+            as hess_func(*X.T) and must return an (n, n, N) array.
+        vectorized, workers : see stencil.evaluate_points.
+    Returns:
+        C : ndarray (N,)
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    S = np.asarray(S, dtype=float)
+    H = evaluate_points(hess_func, X, vectorized=vectorized, workers=workers)   # (N, n, n)
+    quad_forms = np.abs(np.einsum('im,pij,jm->pm', S, H, S))
+    return quad_forms.max(axis=1) / np.linalg.norm(S, axis=0).max()
+
+def hessian_norms(X, hess_func, vectorized=False, workers=None):
+    """
+    Spectral norms ||H(x)||_2 at a stack of points, the local Lipschitz constant
+    of the gradient (the largest |eigenvalue| for a symmetric Hessian).
+    Parameters:
+        X : ndarray (N, n)
+            Points.
+        hess_func, vectorized, workers : see curvature_constants.
+    Returns:
+        L : ndarray (N,)
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    H = evaluate_points(hess_func, X, vectorized=vectorized, workers=workers)   # (N, n, n)
+    return np.linalg.norm(H, 2, axis=(1, 2))
+
+def lipschitz_constants(X, S, grad_func, h=1.0, vectorized=False, workers=None):
+    """
+    Estimate the Lipschitz constant of the gradient at a stack of points from
+    gradient differences along S, max_i ||g(x + h s_i) - g(x)|| / (h ||s_i||).
+    All N (m+1) gradients are evaluated in one batch.
+    Parameters:
+        X : ndarray (N, n)
+            Points.
+        S : ndarray (n, m)
+            Direction matrix.
+        grad_func : callable
+            Gradient, called as grad_func(*x).
+        h : float, optional
+            Step along the directions (default 1, as estimate_lipschitz_from_gradients).
+        vectorized, workers : see stencil.evaluate_points.
+    Returns:
+        L : ndarray (N,)
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=float))
+    S = np.asarray(S, dtype=float)
+    N, n = X.shape
+    m = S.shape[1]
+    steps = np.vstack([np.zeros(n), h * S.T])                        # (m+1, n)
+    points = (X[:, None, :] + steps[None, :, :]).reshape(-1, n)
+    G = evaluate_points(grad_func, points, vectorized=vectorized, workers=workers).reshape(N, m + 1, -1)
+    norms = h * np.linalg.norm(S, axis=0)
+    ratios = np.linalg.norm(G[:, 1:] - G[:, :1], axis=2)[:, norms > 0] / norms[norms > 0]
+    return ratios.max(axis=1) if ratios.shape[1] else np.zeros(N)
+
+def gsg_error_bound_table(X, S, h_values, L=None, hess_func=None, grad_func=None, vectorized=False, workers=None):
+    """
+    Lipschitz error bounds sqrt(m)/2 L(x) h of the GSG for every combination of
+    points and step sizes, so h can be chosen before any function evaluation.
+    Parameters:
+        X : ndarray (N, n)
+            Points.
+        S : ndarray (n, m)
+            Direction matrix.
+        h_values : array_like (K,)
+            Candidate step sizes.
+        L : float or ndarray (N,), optional
+            Lipschitz constants of the gradient, if known.
+        hess_func : callable, optional
+            Used when L is not given: L(x) = hessian_norms(X, hess_func) = ||H(x)||_2.
+        grad_func : callable, optional
+            Used when neither L nor hess_func is given: L(x) = lipschitz_constants(X, S, grad_func).
+        vectorized, workers : see stencil.evaluate_points.
+    Returns:
+        bounds : ndarray (N, K)
+            bounds[p, j] is the bound at X[p] with step h_values[j].
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=float))
     S = np.asarray(S, dtype=float)
-    n, m = S.shape
-    grad0 = np.array(grad_func(*x0))
-    lipschitz_estimates = []
-    for i in range(m):
-        x1 = x0 + S[:, i]
-        gradi = np.array(grad_func(*x1))
-        diff = np.linalg.norm(gradi - grad0)
-        step = np.linalg.norm(S[:, i])
-        if step > 0:
-            lipschitz_estimates.append(diff / step)
-    return max(lipschitz_estimates) if lipschitz_estimates else 0.0
\ No newline at end of file
+    if L is None:
+        if hess_func is not None:
+            L = hessian_norms(X, hess_func, vectorized=vectorized, workers=workers)
+        elif grad_func is not None:
+            L = lipschitz_constants(X, S, grad_func, vectorized=vectorized, workers=workers)
+        else:
+            raise ValueError("One of L, hess_func or grad_func is required")
+    L = np.broadcast_to(np.asarray(L, dtype=float), (len(X),))
+    h_values = np.atleast_1d(np.asarray(h_values, dtype=float))
+    return gsg_error_bound_lipschitz(S.shape[1], h_values[None, :], L[:, None])
@@ -1,7 +1,8 @@
 import numpy as np
-import sympy as sp
+from stencil import pinv_t, lattice_values, contract_t, second_difference
+from directions import as_direction_matrix
 
-def gsh_from_func(fun, x0, S, T, h=0.01):
+def gsh_from_func(fun, x0, S, T, h=0.01, vectorized=False, workers=None, solver="pinv", return_info=False):
     """
     Compute the Generalized Simplex Hessian (GSH) using a function.
     Parameters:
@@ -10,36 +11,71 @@ def gsh_from_func(fun, x0, S, T, h=0.01):
         x0 : ndarray (n,)
             Base point.
         S : ndarray (n, m)
-            Normalized direction matrix for S (columns have norm 1).
+            Normalized direction matrix for S (columns have norm 1), or the name
+            of a set from directions.DIRECTION_SETS.
         T : ndarray (n, k)
-            Normalized direction matrix for T (columns have norm 1).
+            Normalized direction matrix for T (columns have norm 1), or a set name.
         h : float, optional
             Step size (default 0.01).
+        vectorized : bool, optional
+            Call fun once per batch of points with array coordinates (default False).
+        workers : int or None, optional
+            Number of worker processes for the evaluations (default in-process).
+        solver : str, optional
+            Least-squares backend for S and T: "pinv" (default), "lstsq",
+            "cholesky", "svd" or "auto", see stencil.solve_t.
+        return_info : bool, optional
+            Also return the solver report (per-axis solver, cond, residual).
     Returns:
         H_approx : ndarray (n, n)
             Approximated Hessian matrix.
+        info : dict, only with return_info=True
     """
     x0 = np.asarray(x0, dtype=float)
-    S = np.asarray(S, dtype=float)
-    T = np.asarray(T, dtype=float)
-    n, m = S.shape
-    _, k = T.shape
-    delta = np.zeros((m, k))
+    S = as_direction_matrix(S, len(x0))
+    T = as_direction_matrix(T, len(x0))
 
-    for i in range(m):
-        for j in range(k):
-            f1 = fun(*(x0 + h * S[:, i] + h * T[:, j]))
-            f2 = fun(*(x0 + h * S[:, i]))
-            f3 = fun(*(x0 + h * T[:, j]))
-            f4 = fun(*x0)
-            delta[i, j] = (f1 - f2 - f3 + f4) / (h**2)
+    # f(x0), f(x0 + h s_i), f(x0 + h t_j) and f(x0 + h s_i + h t_j), each evaluated once
+    v = lattice_values(fun, x0, [S, T], h, vectorized=vectorized, workers=workers)
+    delta = second_difference(v) / (h**2)
 
-    S_pinv = np.linalg.pinv(S.T)
-    T_pinv = np.linalg.pinv(T.T)
-    H_approx = S_pinv @ delta @ T_pinv.T
+    return contract_t(delta, [S, T], solver, return_info)
+
+def gsh_from_grad(grad, x0, S, T=None, h=0.01, vectorized=False, workers=None):
+    """
+    Compute the GSH from a gradient oracle using m+1 gradient evaluations.
+    Parameters:
+        grad : callable
+            Gradient of f, called as grad(*x), returning a vector in R^n.
+        x0 : ndarray (n,)
+            Base point.
+        S : ndarray (n, m)
+            Normalized direction matrix for S (columns have norm 1), or the name
+            of a set from directions.DIRECTION_SETS.
+        T : ndarray (n, k) or None, optional
+            Direction matrix for T. The exact inner gradient replaces the simplex
+            gradient along T, so T only projects the result onto its span
+            (default None, no projection).
+        h : float, optional
+            Step size (default 0.01).
+        vectorized, workers : see gsh_from_func.
+    Returns:
+        H_approx : ndarray (n, n)
+            Approximated Hessian matrix.
+    """
+    x0 = np.asarray(x0, dtype=float)
+    S = as_direction_matrix(S, len(x0))
+
+    g = lattice_values(grad, x0, [S], h, vectorized=vectorized, workers=workers)
+    delta = (g[1:] - g[0]) / h  # row i: (grad(x0 + h s_i) - grad(x0)) / h
+    if T is not None:
+        T = as_direction_matrix(T, len(x0))
+        delta = delta @ T @ pinv_t(T).T
+
+    H_approx = pinv_t(S) @ delta
     return H_approx
 
-def gsh_from_values(v, S, T):
+def gsh_from_values(v, S, T, solver="pinv", return_info=False):
     """
     Compute the GSH using only function values.
     Parameters:
@@ -52,16 +88,15 @@ def gsh_from_values(v, S, T):
             Direction matrix S.
         T : ndarray (n, k)
             Direction matrix T.
+        solver, return_info : see gsh_from_func.
     Returns:
         H_approx : ndarray (n, n)
             Approximated Hessian matrix.
+        info : dict, only with return_info=True
     """
     v = np.asarray(v, dtype=float)
-    delta = v[1:,1:] - v[1:,0:1] - v[0:1,1:] + v[0,0]
-    S_pinv = np.linalg.pinv(S.T)
-    T_pinv = np.linalg.pinv(T.T)
-    H_approx = S_pinv @ delta @ T_pinv.T
-    return H_approx
+    delta = second_difference(v)
+    return contract_t(delta, [np.asarray(S, dtype=float), np.asarray(T, dtype=float)], solver, return_info)
 
 def gsh_error_bound(m, k, L_hess, h):
     """
@@ -92,6 +127,8 @@ def estimate_lipschitz_hessian_from_symbolic(x_syms, f_expr):
         lipschitz_func : callable
             Evaluates estimated Lipschitz constant at a given point.
     """
+    import sympy as sp
+
     n = len(x_syms)
     third_derivs = []
     for i in range(n):
@@ -0,0 +1,122 @@
+import numpy as np
+from stencil import pinv_t, lattice_values, second_difference
+
+# Noise-aware estimation for stochastic objectives: every lattice point is
+# evaluated several times in one batch, the replicates are averaged at the value
+# level, and the spread between replicates gives a standard error for the
+# resulting gradient or Hessian.
+
+
+def _replicated(fun, replicates, vectorized):
+    # fun evaluated `replicates` times per point, returned as a vector of replicates
+    if not vectorized:
+        return lambda *x: [fun(*x) for _ in range(replicates)]
+
+    def replicated(*x):
+        x = np.broadcast_arrays(*[np.asarray(c, dtype=float) for c in x])
+        N = x[0].size
+        values = fun(*[np.repeat(c.ravel(), replicates) for c in x])
+        values = np.broadcast_to(np.asarray(values, dtype=float), (N * replicates,))
+        return values.reshape(N, replicates).T
+
+    return replicated
+
+
+def _replicated_estimate(fun, x0, mats, h, contract, replicates, tol, max_replicates, vectorized, workers, rng):
+    # Each batch gets a fresh child seed, so worker processes never repeat earlier draws
+    seeds = rng if isinstance(rng, np.random.SeedSequence) else np.random.SeedSequence(rng)
+    v = lattice_values(_replicated(fun, replicates, vectorized), x0, mats, h,
+                       vectorized=vectorized, workers=workers, seed=seeds.spawn(1)[0])
+    while True:
+        R = v.shape[-1]
+        mean = v.mean(axis=-1, keepdims=True)
+        estimate = contract(mean)[..., 0]
+        if R > 1:
+            spread = contract(v - mean)
+            stderr = np.sqrt(np.sum(spread**2, axis=-1) / (R * (R - 1)))
+        else:
+            stderr = np.full(estimate.shape, np.nan)
+
+        if tol is None or R >= max_replicates or (R > 1 and np.max(stderr) <= tol):
+            return estimate, stderr
+        # Standard error decays like 1/sqrt(R): aim for the count that reaches tol
+        target = R * 2 if R == 1 else int(np.ceil(R * (np.max(stderr) / tol) ** 2))
+        extra = min(max(target, R + 1), max_replicates) - R
+        more = lattice_values(_replicated(fun, extra, vectorized), x0, mats, h,
+                              vectorized=vectorized, workers=workers, seed=seeds.spawn(1)[0])
+        v = np.concatenate([v, more], axis=-1)
+
+
+def noisy_gsg(fun, x0, S, h=0.01, replicates=4, tol=None, max_replicates=256, vectorized=False, workers=None,
+              rng=None):
+    """
+    Compute the GSG of a noisy function from replicated evaluations.
+    Parameters:
+        fun : callable
+            Stochastic function from R^n to R, called as fun(*x).
+        x0 : ndarray (n,)
+            Base point.
+        S : ndarray (n, m)
+            Normalized direction matrix (columns have norm 1).
+        h : float, optional
+            Step size (default 0.01).
+        replicates : int, optional
+            Evaluations per point, all done in one batch (default 4).
+        tol : float or None, optional
+            Adaptive mode: keep adding replicates (in batches sized from the observed
+            variance) until the largest standard error is at most tol (default None).
+        max_replicates : int, optional
+            Upper limit on replicates per point in adaptive mode (default 256).
+        vectorized, workers : see gsg_from_func.
+        rng : int, numpy SeedSequence or None, optional
+            Seed for the worker processes: with workers, each evaluation task
+            reseeds np.random and the random module from its own child seed, so
+            every point and every adaptive batch gets independent draws. fun
+            should draw from those global generators (a Generator object captured
+            by fun would be copied unchanged into every worker). Unused without
+            workers, where fun simply keeps drawing in-process.
+    Returns:
+        grad : ndarray (n,)
+            Gradient estimate from the replicate-averaged values.
+        stderr : ndarray (n,)
+            Componentwise standard error, from the spread between replicates
+            (NaN with a single replicate).
+    """
+    x0 = np.asarray(x0, dtype=float)
+    S = np.asarray(S, dtype=float)
+    S_pinv = pinv_t(S)
+
+    def contract(v):
+        return S_pinv @ ((v[1:] - v[0]) / h)
+
+    return _replicated_estimate(fun, x0, [S], h, contract, replicates, tol, max_replicates, vectorized, workers, rng)
+
+
+def noisy_gsh(fun, x0, S, T, h=0.01, replicates=4, tol=None, max_replicates=256, vectorized=False, workers=None,
+              rng=None):
+    """
+    Compute the GSH of a noisy function from replicated evaluations.
+    Parameters:
+        fun : callable
+            Stochastic function of n variables, called as fun(*x).
+        x0 : ndarray (n,)
+            Base point.
+        S, T : ndarray (n, m), (n, k)
+            Normalized direction matrices (columns have norm 1).
+        h, replicates, tol, max_replicates, vectorized, workers, rng : see noisy_gsg.
+    Returns:
+        H_approx : ndarray (n, n)
+            Hessian estimate from the replicate-averaged values.
+        stderr : ndarray (n, n)
+            Entrywise standard error (NaN with a single replicate).
+    """
+    x0 = np.asarray(x0, dtype=float)
+    S = np.asarray(S, dtype=float)
+    T = np.asarray(T, dtype=float)
+    S_pinv, T_pinv = pinv_t(S), pinv_t(T)
+
+    def contract(v):
+        delta = second_difference(v) / (h**2)
+        return np.einsum('ai,bj,ijr->abr', S_pinv, T_pinv, delta, optimize=True)
+
+    return _replicated_estimate(fun, x0, [S, T], h, contract, replicates, tol, max_replicates, vectorized, workers, rng)
@@ -0,0 +1,168 @@
+import numpy as np
+from stencil import evaluate_points, lattice_points, second_difference, solve_t, contract_t
+
+# Randomized (sketched) direction sets for high-dimensional estimation. With
+# m << n random directions the GSG/GSH only see the projection of the true
+# derivative onto a random subspace; scaling by n/m makes the estimate unbiased
+# and averaging over repeated sketches trades evaluations for variance. The
+# sketches are solved with the QR backend of stencil.solve_t, which handles both
+# m <= n and the redundant Gaussian sets with m > n.
+
+
+def random_directions(n, m, kind="orthogonal", rng=None):
+    """
+    Draw m random unit directions in R^n.
+    Parameters:
+        n, m : int
+            Dimension and number of directions.
+        kind : str, optional
+            "orthogonal" (orthonormal columns spanning a uniformly random subspace,
+            requires m <= n) or "gaussian" (independent normalized Gaussian vectors).
+        rng : numpy Generator, int or None, optional
+            Random generator or seed.
+    Returns:
+        S : ndarray (n, m)
+            Direction matrix with unit-norm columns.
+    """
+    rng = np.random.default_rng(rng)
+    G = rng.standard_normal((n, m))
+    if kind == "orthogonal":
+        if m > n:
+            raise ValueError(f"orthogonal directions require m <= n (got m={m}, n={n})")
+        Q, R = np.linalg.qr(G)
+        return Q * np.sign(np.diag(R))
+    if kind == "gaussian":
+        return G / np.linalg.norm(G, axis=0)
+    raise ValueError(f"Unknown direction kind '{kind}' (expected 'orthogonal' or 'gaussian')")
+
+
+def _batched_lattices(fun, x0, mat_sets, h, vectorized, workers):
+    # One evaluation batch for the lattices of all sketches; f(x0) is shared
+    x0 = np.asarray(x0, dtype=float)
+    grids = [lattice_points(x0, mats, h)[1:] for mats in mat_sets]
+    points = np.vstack([x0[None, :]] + grids)
+    values = evaluate_points(fun, points, vectorized=vectorized, workers=workers)
+
+    result, start = [], 1
+    for mats, grid in zip(mat_sets, grids):
+        shape = tuple(M.shape[1] + 1 for M in mats)
+        v = np.concatenate([values[:1], values[start:start + len(grid)]])
+        result.append(v.reshape(shape + values.shape[1:]))
+        start += len(grid)
+    return result
+
+
+def _mean_and_variance(estimates):
+    estimates = np.asarray(estimates)
+    mean = estimates.mean(axis=0)
+    if len(estimates) < 2:
+        return mean, np.full(mean.shape, np.nan)
+    return mean, estimates.var(axis=0, ddof=1) / len(estimates)
+
+
+def sketched_gsg(fun, x0, m, h=0.01, kind="orthogonal", repeats=1, rng=None, unbiased=True,
+                 vectorized=False, workers=None):
+    """
+    Estimate the gradient from m random directions per sketch, averaged over repeats.
+    Parameters:
+        fun : callable
+            Function from R^n to R, called as fun(*x).
+        x0 : ndarray (n,)
+            Base point.
+        m : int
+            Number of random directions per sketch.
+        h : float, optional
+            Step size (default 0.01).
+        kind : str, optional
+            Direction distribution, see random_directions (default "orthogonal").
+        repeats : int, optional
+            Number of independent sketches, evaluated in one batch (default 1).
+        rng : numpy Generator, int or None, optional
+            Random generator or seed.
+        unbiased : bool, optional
+            Scale each subspace estimate by n/m so its expectation is the gradient
+            (default True). With False the plain GSG along the sketch is returned.
+        vectorized, workers : see gsg_from_func.
+    Returns:
+        grad : ndarray (n,)
+            Gradient estimate (mean over sketches).
+        variance : ndarray (n,)
+            Componentwise variance of the mean, from the spread between sketches
+            (NaN when repeats == 1).
+        Uses 1 + m * repeats function evaluations.
+    """
+    x0 = np.asarray(x0, dtype=float)
+    n = len(x0)
+    rng = np.random.default_rng(rng)
+    sketches = [random_directions(n, m, kind, rng) for _ in range(repeats)]
+    grids = _batched_lattices(fun, x0, [[S] for S in sketches], h, vectorized, workers)
+
+    scale = n / m if unbiased else 1.0
+    estimates = [scale * solve_t(S, (v[1:] - v[0]) / h, "lstsq") for S, v in zip(sketches, grids)]
+    return _mean_and_variance(estimates)
+
+
+def sketched_gsh(fun, x0, m, k=None, h=0.01, kind="orthogonal", repeats=1, rng=None, unbiased=True,
+                 vectorized=False, workers=None):
+    """
+    Estimate the Hessian from independent random direction sets S (n x m) and
+    T (n x k) per sketch, averaged over repeats.
+    Parameters:
+        fun : callable
+            Function from R^n to R, called as fun(*x).
+        x0 : ndarray (n,)
+            Base point.
+        m, k : int
+            Number of random directions in S and T (k defaults to m).
+        unbiased : bool, optional
+            Scale each estimate by n^2 / (m k) (default True).
+        h, kind, repeats, rng, vectorized, workers : see sketched_gsg.
+    Returns:
+        H_approx : ndarray (n, n)
+            Hessian estimate (mean over sketches).
+        variance : ndarray (n, n)
+            Entrywise variance of the mean (NaN when repeats == 1).
+        Uses 1 + ((m+1)(k+1) - 1) * repeats function evaluations.
+    """
+    x0 = np.asarray(x0, dtype=float)
+    n = len(x0)
+    k = m if k is None else k
+    rng = np.random.default_rng(rng)
+    sketches = [(random_directions(n, m, kind, rng), random_directions(n, k, kind, rng)) for _ in range(repeats)]
+    grids = _batched_lattices(fun, x0, [list(ST) for ST in sketches], h, vectorized, workers)
+
+    scale = n * n / (m * k) if unbiased else 1.0
+    estimates = []
+    for (S, T), v in zip(sketches, grids):
+        delta = second_difference(v) / (h**2)
+        estimates.append(scale * contract_t(delta, [S, T], "lstsq"))
+    return _mean_and_variance(estimates)
+
+
+def sketched_gsh_from_grad(grad, x0, m, h=0.01, kind="orthogonal", repeats=1, rng=None, unbiased=True,
+                           vectorized=False, workers=None):
+    """
+    Estimate the Hessian from a gradient oracle along m random directions per
+    sketch, averaged over repeats.
+    Parameters:
+        grad : callable
+            Gradient of f, called as grad(*x), returning a vector in R^n.
+        unbiased : bool, optional
+            Scale each estimate by n/m (default True).
+        x0, m, h, kind, repeats, rng, vectorized, workers : see sketched_gsg.
+    Returns:
+        H_approx : ndarray (n, n)
+            Hessian estimate (mean over sketches).
+        variance : ndarray (n, n)
+            Entrywise variance of the mean (NaN when repeats == 1).
+        Uses 1 + m * repeats gradient evaluations.
+    """
+    x0 = np.asarray(x0, dtype=float)
+    n = len(x0)
+    rng = np.random.default_rng(rng)
+    sketches = [random_directions(n, m, kind, rng) for _ in range(repeats)]
+    grids = _batched_lattices(grad, x0, [[S] for S in sketches], h, vectorized, workers)
+
+    scale = n / m if unbiased else 1.0
+    estimates = [scale * solve_t(S, (g[1:] - g[0]) / h, "lstsq") for S, g in zip(sketches, grids)]
+    return _mean_and_variance(estimates)
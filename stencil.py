@@ -0,0 +1,597 @@
+import numpy as np
+import itertools
+import multiprocessing
+import os
+import random
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+# Shared machinery for the estimators: cached factorizations of the direction
+# matrices and evaluation of f (or of a gradient oracle) on forward lattices.
+
+PINV_CACHE_SIZE = 32
+DEFAULT_BLOCK_SIZE = 4096
+DEFAULT_CHUNK_BYTES = 64 << 20
+WORKER_CHUNK_SIZE = 1024
+
+# Solver selection for solver="auto": the normal equations square the condition
+# number, so Cholesky is used only for well-conditioned S; singular values below
+# SVD_RCOND * sigma_max are truncated.
+SOLVERS = ("pinv", "lstsq", "cholesky", "svd", "auto")
+CHOLESKY_MAX_COND = 1e4
+SVD_RCOND = 1e-8
+
+_PINV_CACHE = OrderedDict()
+
+
+def _matrix_key(S):
+    return (S.shape, S.dtype.str, S.tobytes())
+
+
+def _cached(kind, S, build, key=None):
+    # LRU cache of factorizations of S, shared by all kinds (pinv, qr, ...). Callers
+    # that look up several kinds pass the matrix key, built once (it copies S)
+    S = np.ascontiguousarray(S, dtype=float)
+    key = (kind,) + (_matrix_key(S) if key is None else key)
+    value = _PINV_CACHE.get(key)
+    if value is None:
+        value = build(S)
+        _PINV_CACHE[key] = value
+        if len(_PINV_CACHE) > PINV_CACHE_SIZE:
+            _PINV_CACHE.popitem(last=False)
+    else:
+        _PINV_CACHE.move_to_end(key)
+    return value
+
+
+def _read_only(*arrays):
+    for a in arrays:
+        a.setflags(write=False)
+    return arrays if len(arrays) > 1 else arrays[0]
+
+
+def pinv_t(S):
+    """
+    Pseudo-inverse of S.T, cached per direction matrix.
+    Parameters:
+        S : ndarray (n, m)
+            Direction matrix.
+    Returns:
+        S_pinv : ndarray (n, m), read-only
+            np.linalg.pinv(S.T); repeated calls with an equal S reuse the factorization.
+    """
+    return _cached("pinv", S, _pinv_factor)
+
+
+def _pinv_factor(S):
+    return _read_only(np.linalg.pinv(S.T))
+
+
+def singular_values(S):
+    """Singular values of S in decreasing order, cached per direction matrix."""
+    return _cached("sigma", S, lambda S: _read_only(np.linalg.svd(S, compute_uv=False)))
+
+
+def clear_cache():
+    """Drop all cached factorizations."""
+    _PINV_CACHE.clear()
+
+
+def _gram(S):
+    # The smaller Gram matrix, S S^T (n x n) for m >= n or S^T S (m x m)
+    n, m = S.shape
+    return _read_only(S @ S.T if m >= n else S.T @ S)
+
+
+def _condition(S, key):
+    # cond(S) from the singular values when already known (e.g. catalogue sets),
+    # otherwise from the eigenvalues of the cached Gram matrix, cond(S)^2 = cond(G),
+    # which costs O(n m min(n, m)) instead of a full SVD of S
+    sigma = _PINV_CACHE.get(("sigma",) + key)
+    if sigma is not None:
+        return sigma[0] / sigma[-1] if sigma[-1] > 0 else np.inf
+    lam = np.linalg.eigvalsh(_cached("gram", S, _gram, key))
+    if lam[0] <= np.finfo(float).eps * len(lam) * lam[-1]:
+        # Smallest eigenvalue at roundoff level: numerically rank deficient
+        return np.inf
+    return np.sqrt(lam[-1] / lam[0])
+
+
+def _qr_factor(S):
+    # S.T = Q R for m >= n; S = Q R (so S.T = R^T Q^T) for m < n
+    n, m = S.shape
+    tall = m >= n
+    Q, R = np.linalg.qr(S.T if tall else S)
+    return _read_only(Q, R) + (tall,)
+
+
+def _cholesky_factor(S, key):
+    # Cholesky factor of the smaller Gram matrix, None when it is numerically singular
+    n, m = S.shape
+    tall = m >= n
+    G = _cached("gram", S, _gram, key)
+    try:
+        L = np.linalg.cholesky(G)
+    except np.linalg.LinAlgError:
+        return None, tall
+    d = np.diag(L)
+    if d.min() ** 2 <= np.finfo(float).eps * len(d) * d.max() ** 2:
+        return None, tall
+    return _read_only(L), tall
+
+
+def _svd_factor(S):
+    # Truncated SVD of S.T = U diag(s) Vt
+    U, s, Vt = np.linalg.svd(S.T, full_matrices=False)
+    r = max(1, int(np.count_nonzero(s > SVD_RCOND * s[0])))
+    return _read_only(U[:, :r].copy(), s[:r].copy(), Vt[:r].copy())
+
+
+def select_solver(S):
+    """
+    Choose a least-squares backend from the conditioning of S: "cholesky" when
+    cond(S) <= CHOLESKY_MAX_COND, "lstsq" (QR) up to 1 / SVD_RCOND, "svd"
+    (truncated) beyond that or when S is rank deficient. cond(S) is estimated
+    from the Gram matrix that the Cholesky backend factors anyway, so choosing
+    does not cost a full SVD.
+    """
+    S = np.ascontiguousarray(S, dtype=float)
+    return _select_solver(S, _matrix_key(S))
+
+
+def _select_solver(S, key):
+    cond = _condition(S, key)
+    if cond <= CHOLESKY_MAX_COND:
+        return "cholesky"
+    if cond <= 1.0 / SVD_RCOND:
+        return "lstsq"
+    return "svd"
+
+
+def solve_t(S, D, solver="pinv", return_info=False):
+    """
+    Minimum-norm least-squares solution X of S.T X = D, i.e. pinv(S.T) @ D,
+    without forming the pseudo-inverse unless solver="pinv". "lstsq" and
+    "cholesky" need S of full rank; when their factor shows that S is rank
+    deficient they fall back to the truncated SVD, which keeps the
+    minimum-norm solution (the report then names "svd").
+    Parameters:
+        S : ndarray (n, m)
+            Direction matrix.
+        D : ndarray (m,) or (m, c)
+            Right-hand side(s), e.g. forward differences.
+        solver : str, optional
+            "pinv" (cached explicit pseudo-inverse, default), "lstsq" (QR),
+            "cholesky" (normal equations), "svd" (truncated SVD) or "auto"
+            (see select_solver). Factorizations are cached per matrix.
+        return_info : bool, optional
+            Also return a dict with the solver used, cond(S) and the residual
+            norm ||S.T X - D|| (nonzero when redundant directions disagree).
+    Returns:
+        X : ndarray (n,) or (n, c)
+        info : dict, only with return_info=True
+    """
+    S = np.ascontiguousarray(S, dtype=float)
+    D = np.asarray(D, dtype=float)
+    key = _matrix_key(S)
+    name = _select_solver(S, key) if solver == "auto" else solver
+    if name not in SOLVERS or name == "auto":
+        raise ValueError(f"Unknown solver '{solver}' (expected one of {', '.join(SOLVERS)})")
+    if name == "pinv":
+        X = _cached("pinv", S, _pinv_factor, key) @ D
+    if name == "lstsq":
+        Q, R, tall = _cached("qr", S, _qr_factor, key)
+        d = np.abs(np.diag(R))
+        if d.min() <= SVD_RCOND * d.max():
+            name = "svd"
+        else:
+            X = np.linalg.solve(R, Q.T @ D) if tall else Q @ np.linalg.solve(R.T, D)
+    if name == "cholesky":
+        L, tall = _cached("cholesky", S, lambda S: _cholesky_factor(S, key), key)
+        if L is None:
+            name = "svd"
+        elif tall:
+            X = np.linalg.solve(L.T, np.linalg.solve(L, S @ D))
+        else:
+            X = S @ np.linalg.solve(L.T, np.linalg.solve(L, D))
+    if name == "svd":
+        U, s, Vt = _cached("svd", S, _svd_factor, key)
+        X = Vt.T @ ((U.T @ D) / s.reshape((-1,) + (1,) * (D.ndim - 1)))
+    if not return_info:
+        return X
+    return X, {"solver": name, "cond": float(_condition(S, key)), "residual": float(np.linalg.norm(S.T @ X - D))}
+
+
+def contract_t(delta, mats, solver="pinv", return_info=False):
+    """
+    Apply pinv(M.T) of mats[p] along axis p of a difference tensor, i.e.
+    pinv_t(S) @ delta (GSG), pinv_t(S) @ delta @ pinv_t(T).T (GSH) or the
+    three-way contraction of the GST, solving one axis at a time with solve_t.
+    Parameters:
+        delta : ndarray (m_1, ..., m_P[, ...])
+            Mixed forward differences.
+        mats : list of ndarray (n, m_p)
+            Direction matrices S, T, U.
+        solver, return_info : see solve_t.
+    Returns:
+        result : ndarray (n, ..., n[, ...])
+        info : dict of per-axis lists "solver", "cond", "residual", only with return_info=True
+    """
+    result = np.asarray(delta, dtype=float)
+    info = {"solver": [], "cond": [], "residual": []}
+    for p, M in enumerate(mats):
+        D = np.moveaxis(result, p, 0)
+        rest = D.shape[1:]
+        X = solve_t(M, D.reshape(D.shape[0], -1), solver, return_info)
+        if return_info:
+            X, axis_info = X
+            for key in info:
+                info[key].append(axis_info[key])
+        result = np.moveaxis(X.reshape((X.shape[0],) + rest), 0, p)
+    return (result, info) if return_info else result
+
+
+def _evaluate_chunk(fun, points, vectorized):
+    N = len(points)
+    if not vectorized:
+        return np.array([fun(*p) for p in points], dtype=float)
+    out = fun(*points.T)
+    if isinstance(out, (list, tuple)):
+        # Vector-valued (e.g. lambdified gradient): one entry per component
+        return np.stack([np.broadcast_to(np.asarray(c, dtype=float), (N,)) for c in out], axis=1)
+    out = np.asarray(out, dtype=float)
+    if out.ndim >= 2:
+        # Components first, matching the coordinates-first calling convention
+        return np.moveaxis(out, -1, 0)
+    return np.broadcast_to(out, (N,)).copy()
+
+
+_worker_fun = None
+_worker_buffers = {}
+
+
+def _init_worker(fun):
+    global _worker_fun
+    _worker_fun = fun
+
+
+def _worker_array(name, shape):
+    shm = _worker_buffers.get(name)
+    if shm is None:
+        shm = shared_memory.SharedMemory(name=name)
+        _worker_buffers[name] = shm
+    return np.ndarray(shape, dtype=float, buffer=shm.buf)
+
+
+def _worker_evaluate_range(points_name, points_shape, values_name, values_shape, start, stop, vectorized,
+                           seed=None):
+    # Read points and write values in place in shared memory; only names and
+    # index ranges travel through the task queue
+    if seed is not None:
+        # Forked workers inherit the parent's random state: give each task its own stream
+        np.random.seed(seed.generate_state(4))
+        random.seed(int(seed.generate_state(1, np.uint64)[0]))
+    points = _worker_array(points_name, points_shape)
+    values = _worker_array(values_name, values_shape)
+    for i in range(start, stop, WORKER_CHUNK_SIZE):
+        j = min(i + WORKER_CHUNK_SIZE, stop)
+        values[i:j] = _evaluate_chunk(_worker_fun, points[i:j], vectorized)
+
+
+@contextmanager
+def _process_pool(fun, workers, seed=None):
+    if not workers or workers <= 1:
+        yield None
+        return
+    # fork lets lambdified (unpicklable) functions reach the workers
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork") if "fork" in methods else None
+    pool = {"workers": workers, "buffers": {}, "seed": seed}
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(fun,)) as executor:
+            pool["executor"] = executor
+            yield pool
+    finally:
+        for shm in pool["buffers"].values():
+            shm.close()
+            shm.unlink()
+
+
+def _shared_array(pool, key, shape):
+    # Shared buffers are kept for the lifetime of the pool and only regrown when too small
+    size = max(8, 8 * int(np.prod(shape)))
+    shm = pool["buffers"].get(key)
+    if shm is None or shm.size < size:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        pool["buffers"][key] = shm
+    return shm.name, np.ndarray(shape, dtype=float, buffer=shm.buf)
+
+
+def _evaluate(fun, points, vectorized, pool):
+    if pool is None or len(points) < 2:
+        return _evaluate_chunk(fun, points, vectorized)
+    # The first value is computed here to learn the output shape (scalar or vector)
+    first = _evaluate_chunk(fun, points[:1], vectorized)
+    N = len(points)
+    points_name, shared_points = _shared_array(pool, "points", points.shape)
+    values_name, shared_values = _shared_array(pool, "values", (N,) + first.shape[1:])
+    shared_points[:] = points
+    shared_values[0] = first[0]
+
+    bounds = np.linspace(1, N, min(N - 1, 4 * pool["workers"]) + 1).astype(int)
+    ranges = [(start, stop) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+    seeds = pool["seed"].spawn(len(ranges)) if pool["seed"] is not None else [None] * len(ranges)
+    tasks = [pool["executor"].submit(_worker_evaluate_range, points_name, points.shape, values_name,
+                                     shared_values.shape, start, stop, vectorized, task_seed)
+             for (start, stop), task_seed in zip(ranges, seeds)]
+    for task in tasks:
+        task.result()
+    values = shared_values.copy()
+    del shared_points, shared_values
+    return values
+
+
+def evaluate_points(fun, points, vectorized=False, workers=None, seed=None):
+    """
+    Evaluate fun at every row of points.
+    Parameters:
+        fun : callable
+            Called as fun(*x). With vectorized=True it is called as fun(*points.T)
+            and must accept array coordinates (as lambdified SymPy functions do).
+        points : ndarray (N, n)
+            Evaluation points.
+        vectorized : bool, optional
+            Evaluate a whole batch of points per call (default False).
+        workers : int or None, optional
+            Number of worker processes (None or 1 evaluates in-process). Points
+            and values are exchanged through shared memory; workers receive only
+            index ranges.
+        seed : numpy SeedSequence or None, optional
+            With workers, every task reseeds NumPy's global generator and the
+            random module from its own child of seed, so stochastic functions
+            drawing from them get independent noise in each process (forked
+            workers otherwise all start from a copy of the parent's state).
+    Returns:
+        values : ndarray (N,) for scalar functions, (N, d) for vector-valued ones,
+            (N, d1, d2) for matrix-valued ones (e.g. a Hessian)
+    """
+    points = np.atleast_2d(np.asarray(points, dtype=float))
+    with _process_pool(fun, workers, seed) as pool:
+        return _evaluate(fun, points, vectorized, pool)
+
+
+class EvaluationCache:
+    """
+    Bounded memo of function values keyed by evaluation point, kept in
+    least-recently-used order (a sliding window over recent evaluations).
+    Points are matched after rounding their coordinates to multiples of
+    resolution, so the same point reached through differently rounded sums
+    (e.g. (x0 + h s_i) + h t_j and x0 + (h s_i + h t_j)) is found.
+    """
+
+    def __init__(self, capacity=100000, resolution=1e-12):
+        self.capacity = capacity
+        self.resolution = resolution
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+
+    def __len__(self):
+        return len(self._values)
+
+    def keys_for(self, points):
+        q = np.round(np.asarray(points, dtype=float) / self.resolution) + 0.0
+        return [row.tobytes() for row in q]
+
+    def get(self, key):
+        value = self._values.get(key)
+        if value is not None:
+            self._values.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._values[key] = value
+        self._values.move_to_end(key)
+        while len(self._values) > self.capacity:
+            self._values.popitem(last=False)
+
+    def clear(self):
+        self._values.clear()
+        self.hits = self.misses = 0
+
+
+def _evaluate_cached(fun, points, vectorized, pool, cache):
+    if cache is None:
+        return _evaluate(fun, points, vectorized, pool)
+    keys = cache.keys_for(points)
+    cached = [cache.get(key) for key in keys]
+    missing = [i for i, value in enumerate(cached) if value is None]
+    cache.hits += len(points) - len(missing)
+    cache.misses += len(missing)
+    if missing:
+        new = _evaluate(fun, points[missing], vectorized, pool)
+        for i, value in zip(missing, new):
+            cached[i] = value
+            cache.put(keys[i], value)
+    return np.array(cached, dtype=float)
+
+
+def same_matrix(A, B):
+    """True when A and B are the same direction matrix (identical object or equal entries)."""
+    return A is B or (A.shape == B.shape and np.array_equal(A, B))
+
+
+def _opposite_columns(M):
+    # Lattice index of the column -M[:, i-1] for every lattice index i, -1 when M
+    # has no such column (index 0, no step, never cancels); + 0.0 drops signed zeros
+    columns = {col.tobytes(): i + 1 for i, col in enumerate(M.T + 0.0)}
+    return np.array([-1] + [columns.get(col.tobytes(), -1) for col in (-M.T + 0.0)])
+
+
+def _canonical_indices(idx, groups, opposites):
+    # Lattice indices in which steps along opposite columns of identical direction
+    # matrices (+h s_i on one axis, -h s_i on another) cancel to index 0 and the
+    # indices of identical direction matrices are sorted
+    canon = idx.copy()
+    for group, opposite in zip(groups, opposites):
+        if len(group) > 1:
+            for a, b in itertools.combinations(group, 2):
+                cancel = opposite[canon[a]] == canon[b]
+                canon[a, cancel] = 0
+                canon[b, cancel] = 0
+            canon[group] = np.sort(canon[group], axis=0)
+    return canon
+
+
+def output_array(out, shape):
+    """
+    Resolve an output argument into a writable float array of the given shape.
+    Parameters:
+        out : None, str or ndarray
+            None allocates in memory; a path creates a memory-mapped .npy file;
+            an array (e.g. an np.memmap) is used as is.
+        shape : tuple of int
+    Returns:
+        array : ndarray or np.memmap
+    """
+    if out is None:
+        return np.empty(shape)
+    if isinstance(out, (str, os.PathLike)):
+        return np.lib.format.open_memmap(out, mode="w+", dtype=float, shape=shape)
+    if out.shape != tuple(shape):
+        raise ValueError(f"out has shape {out.shape}, expected {tuple(shape)}")
+    return out
+
+
+@contextmanager
+def scratch_file(out):
+    """
+    Temporary .npy path for the memory-mapped intermediates of the out-of-core
+    modes, created next to out when it is a path (in the system temporary
+    directory otherwise) and removed on exit.
+    """
+    directory = os.path.dirname(os.path.abspath(out)) if isinstance(out, (str, os.PathLike)) else None
+    fd, path = tempfile.mkstemp(suffix=".npy", dir=directory)
+    os.close(fd)
+    try:
+        yield path
+    finally:
+        os.remove(path)
+
+
+def default_chunk_size(row_size):
+    """Number of leading-index rows of row_size floats that fit in DEFAULT_CHUNK_BYTES."""
+    return max(1, DEFAULT_CHUNK_BYTES // (8 * max(1, row_size)))
+
+
+def _lattice_offsets(mats, h, n):
+    # Row 0 of each block is the zero step, row i the step h * mats[p][:, i-1]
+    return [np.vstack([np.zeros(n), h * M.T]) for M in mats]
+
+
+def _lattice_steps(offsets, idx):
+    # Sum offsets before adding x0 so permuted steps give bitwise-equal points
+    return sum(D[i] for D, i in zip(offsets, idx))
+
+
+def lattice_points(x0, mats, h):
+    """
+    All points of the forward lattice of lattice_values, without evaluating fun.
+    Returns:
+        points : ndarray (prod(m_p + 1), n)
+            Row-major over the lattice indices, so points.reshape(shape + (n,))[i1, ..., iP]
+            is x0 + h mats[0][:, i1-1] + ..., index 0 meaning no step.
+    """
+    x0 = np.asarray(x0, dtype=float)
+    mats = [np.asarray(M, dtype=float) for M in mats]
+    shape = tuple(M.shape[1] + 1 for M in mats)
+    idx = np.indices(shape).reshape(len(shape), -1)
+    return x0 + _lattice_steps(_lattice_offsets(mats, h, len(x0)), idx)
+
+
+def lattice_values(fun, x0, mats, h, vectorized=False, workers=None, block_size=DEFAULT_BLOCK_SIZE, out=None,
+                   cache=None, seed=None):
+    """
+    Evaluate fun on the forward lattice x0 + h (d1 + ... + dP), where each d_p is
+    either 0 or a column of mats[p].
+    Parameters:
+        fun : callable
+            Function (or gradient oracle) called as fun(*x).
+        x0 : ndarray (n,)
+            Base point.
+        mats : list of ndarray (n, m_p)
+            Direction matrices S, T, U, ...
+        h : float
+            Step size.
+        vectorized, workers, seed : see evaluate_points.
+        block_size : int, optional
+            Number of lattice entries handled at a time; together with out this
+            bounds the working memory.
+        out : None, str or ndarray, optional
+            Where to store the grid, see output_array (default in memory). Required
+            shape (m_1+1, ..., m_P+1[, d]).
+        cache : EvaluationCache or None, optional
+            Values of points already in the cache are reused instead of
+            re-evaluated; newly evaluated points are added to it.
+    Returns:
+        v : ndarray (m_1+1, ..., m_P+1[, d])
+            v[i1, ..., iP] = fun(x0 + h mats[0][:, i1-1] + ...), index 0 meaning no step.
+            Points repeated by identical direction matrices are evaluated once,
+            including those where opposite columns of such matrices cancel.
+    """
+    x0 = np.asarray(x0, dtype=float)
+    mats = [np.asarray(M, dtype=float) for M in mats]
+    shape = tuple(M.shape[1] + 1 for M in mats)
+    total = int(np.prod(shape))
+    offsets = _lattice_offsets(mats, h, len(x0))
+
+    groups = []
+    for p, M in enumerate(mats):
+        for group in groups:
+            if same_matrix(mats[group[0]], M):
+                group.append(p)
+                break
+        else:
+            groups.append([p])
+    opposites = [_opposite_columns(mats[group[0]]) if len(group) > 1 else None for group in groups]
+
+    def blocks():
+        for start in range(0, total, block_size):
+            flat = np.arange(start, min(start + block_size, total))
+            idx = np.array(np.unravel_index(flat, shape))
+            canon = _canonical_indices(idx, groups, opposites)
+            yield flat, canon, np.all(canon == idx, axis=0)
+
+    v = values = None
+    with _process_pool(fun, workers, seed) as pool:
+        for flat, canon, is_canon in blocks():
+            if not np.any(is_canon):
+                continue
+            step = _lattice_steps(offsets, canon[:, is_canon])
+            block = _evaluate_cached(fun, x0 + step, vectorized, pool, cache)
+            if values is None:
+                v = output_array(out, shape + block.shape[1:])
+                values = v.reshape((total,) + v.shape[len(shape):])
+            values[flat[is_canon]] = block
+
+    if any(len(group) > 1 for group in groups):
+        for flat, canon, is_canon in blocks():
+            if not np.all(is_canon):
+                values[flat[~is_canon]] = values[np.ravel_multi_index(canon[:, ~is_canon], shape)]
+    return v
+
+
+def second_difference(v):
+    """
+    Mixed forward difference over the first two lattice axes,
+    v[i, j] - v[i, 0] - v[0, j] + v[0, 0] for i, j >= 1 (trailing axes, e.g. the
+    components of a gradient lattice, are kept).
+    """
+    return v[1:,1:] - v[1:,0:1] - v[0:1,1:] + v[0:1,0:1]
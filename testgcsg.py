@@ -1,8 +1,11 @@
 import numpy as np
 import sympy as sp
 from gcsg import gcsg
+from benchmarks import BENCHMARKS
 
 def true_gradient(fun_str, x0):
+    if fun_str.lower() in BENCHMARKS:
+        return BENCHMARKS[fun_str.lower()].grad(*x0)
     n = len(x0)
     x_sym = sp.symbols(f"x0:{n}")
     f_expr = sp.sympify(fun_str)
@@ -14,11 +17,14 @@ def test_gcsg():
     print("Generalized Centered Simplex Gradient (GCSG) Tester")
     print("--------------------------------------------------")
     
-    fun_str = input("Enter function f(x0, x1, ...) (e.g., 'x0**2 + 3*x1**2'): ").strip()
+    fun_str = input("Enter function f(x0, x1, ...) or a benchmark name (e.g., 'x0**2 + 3*x1**2', 'rosenbrock'): ").strip()
     n = int(input("Enter dimension n: "))
-    x_sym = sp.symbols(f"x0:{n}")
-    f_expr = sp.sympify(fun_str)
-    fun = sp.lambdify(x_sym, f_expr, "numpy")
+    if fun_str.lower() in BENCHMARKS:
+        fun = BENCHMARKS[fun_str.lower()].f
+    else:
+        x_sym = sp.symbols(f"x0:{n}")
+        f_expr = sp.sympify(fun_str)
+        fun = sp.lambdify(x_sym, f_expr, "numpy")
 
     x0 = np.array(list(map(float, input(f"Enter x0 ({n} values): ").split())), dtype=float)
 
@@ -1,9 +1,11 @@
 import numpy as np
 import sympy as sp
 from gcsh import gcsh
-from gsh import gsh  # reuse if needed for symbolic comparison
+from benchmarks import BENCHMARKS
 
 def true_hessian(fun_str, x0):
+    if fun_str.lower() in BENCHMARKS:
+        return BENCHMARKS[fun_str.lower()].hess(*x0)
     n = len(x0)
     x_sym = sp.symbols(f"x0:{n}")
     f_expr = sp.sympify(fun_str)
@@ -13,7 +15,7 @@ def true_hessian(fun_str, x0):
 
 def test_gcsh():
     print("Generalized Centered Simplex Hessian (GCSH) Tester")
-    fun_str = input("Enter function f(x0, x1, ...) (e.g., 'x0**2 + 3*x1**2'): ").strip()
+    fun_str = input("Enter function f(x0, x1, ...) or a benchmark name (e.g., 'x0**2 + 3*x1**2', 'rosenbrock'): ").strip()
     n = int(input("Enter dimension n: "))
     x0 = np.array(list(map(float, input(f"Enter x0 ({n} values): ").split())))
     m = int(input("Enter number of directions in S (columns): "))
@@ -24,9 +26,12 @@ def test_gcsh():
     Ti = np.array([list(map(float, input(f"Row {i+1}: ").split())) for i in range(n)])
     h_values = list(map(float, input("Enter step sizes h (space-separated): ").split()))
 
-    x_sym = sp.symbols(f"x0:{n}")
-    f_expr = sp.sympify(fun_str)
-    fun = sp.lambdify(x_sym, f_expr, 'numpy')
+    if fun_str.lower() in BENCHMARKS:
+        fun = BENCHMARKS[fun_str.lower()].f
+    else:
+        x_sym = sp.symbols(f"x0:{n}")
+        f_expr = sp.sympify(fun_str)
+        fun = sp.lambdify(x_sym, f_expr, 'numpy')
 
     true_H = true_hessian(fun_str, x0)
 
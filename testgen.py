@@ -3,6 +3,8 @@ import sympy as sp
 import itertools
 import argparse
 from gen import generate_simplex_derivative
+from benchmarks import get_benchmark, benchmark_point
+from directions import get_direction_set
 
 def compute_symbolic_tensor(f_sym, variables, order):
     n = len(variables)
@@ -21,26 +23,30 @@ def evaluate_tensor(tensor, variables, point):
     evaluated = np.array([f(*point) for f in funcs], dtype=float)
     return evaluated.reshape(tensor.shape)
 
-def run_simplex_test(f_expr, x0, P, mode='auto', show_all=False, custom_layers=None, S_list=None, h=None, h_list=None):
-    x0 = np.array(x0, dtype=float)
+def run_simplex_test(f_expr, x0, P, mode='auto', show_all=False, custom_layers=None, S_list=None, h=None, h_list=None,
+                     benchmark=None, n=None, scheme='forward', directions='coordinate'):
+    if benchmark is not None:
+        bench = get_benchmark(benchmark)
+        x0 = benchmark_point(bench, n, x0)
+        reference = {1: bench.grad, 2: bench.hess, 3: bench.third}
+        f_numeric = lambda x: bench.f(*x)
+    else:
+        x0 = np.array(x0, dtype=float)
     n = len(x0)
-    variables = sp.symbols([f'x{i}' for i in range(n)])
 
-    local_dict = {str(v): v for v in variables}
-    local_dict.update({'sin': sp.sin, 'cos': sp.cos, 'exp': sp.exp})
-    f_sym = sp.sympify(f_expr, locals=local_dict)
-    f_lambda = sp.lambdify(variables, f_sym, 'numpy')
-    f_numeric = lambda x: f_lambda(*x)
+    if benchmark is None:
+        variables = sp.symbols([f'x{i}' for i in range(n)])
+        local_dict = {str(v): v for v in variables}
+        local_dict.update({'sin': sp.sin, 'cos': sp.cos, 'exp': sp.exp})
+        f_sym = sp.sympify(f_expr, locals=local_dict)
+        f_lambda = sp.lambdify(variables, f_sym, 'numpy')
+        f_numeric = lambda x: f_lambda(*x)
 
     if mode == 'auto':
-        S_list = []
-        h_list_normalized = []
-        for _ in range(P):
-            S = np.eye(n)
-            delta = np.max(np.linalg.norm(S, axis=0))
-            S_hat = S / delta
-            S_list.append(S_hat)
-            h_list_normalized.append(h / delta)  # Adjust step size accordingly
+        # Catalogue sets already have unit columns and a cached pseudo-inverse
+        S_hat = get_direction_set(directions, n).S
+        S_list = [S_hat] * P
+        h_list_normalized = [h] * P
     elif mode == 'manual':
         if S_list is None:
             raise ValueError("In manual mode, S_list must be provided.")
@@ -51,7 +57,7 @@ def run_simplex_test(f_expr, x0, P, mode='auto', show_all=False, custom_layers=N
         else:
             raise ValueError("In manual mode, either h or h_list must be provided.")
 
-    numeric_derivatives = generate_simplex_derivative(f_numeric, x0, S_list, h_list_normalized)
+    numeric_derivatives = generate_simplex_derivative(f_numeric, x0, S_list, h_list_normalized, scheme=scheme)
 
     if custom_layers:
         layers_to_show = custom_layers
@@ -66,8 +72,14 @@ def run_simplex_test(f_expr, x0, P, mode='auto', show_all=False, custom_layers=N
             continue
 
         numeric_tensor = numeric_derivatives[order]
-        symbolic_tensor = compute_symbolic_tensor(f_sym, variables, order)
-        evaluated_tensor = evaluate_tensor(symbolic_tensor, variables, x0)
+        if benchmark is not None:
+            if order not in reference:
+                print(f"\n[!] Benchmark '{benchmark}' provides closed-form derivatives up to order 3 only.")
+                continue
+            evaluated_tensor = reference[order](*x0)
+        else:
+            symbolic_tensor = compute_symbolic_tensor(f_sym, variables, order)
+            evaluated_tensor = evaluate_tensor(symbolic_tensor, variables, x0)
         abs_error = np.abs(numeric_tensor - evaluated_tensor)
         rel_error = abs_error / (np.abs(evaluated_tensor) + 1e-8)   #doublecheck, how we define norm for 3d and 4d
 
@@ -79,18 +91,29 @@ def run_simplex_test(f_expr, x0, P, mode='auto', show_all=False, custom_layers=N
 
 def main():
     parser = argparse.ArgumentParser(description="Run generalized simplex derivative test.")
-    parser.add_argument('--expr', type=str, required=True, help="Function expression in x0, x1, ...")
-    parser.add_argument('--x0', type=str, required=True, help="Point as comma-separated values, e.g., 1,2")
+    parser.add_argument('--expr', type=str, help="Function expression in x0, x1, ...")
+    parser.add_argument('--benchmark', type=str,
+                        help="Built-in test function instead of --expr (rosenbrock, quartic, trigonometric, powell, quadratic)")
+    parser.add_argument('--n', type=int, help="Dimension for --benchmark (x0 defaults to its standard point)")
+    parser.add_argument('--x0', type=str, help="Point as comma-separated values, e.g., 1,2")
     parser.add_argument('--order', type=int, required=True, help="P-th order of derivative to compute")
     parser.add_argument('--layers', type=str, default='', help="Comma-separated list of layers to show (e.g. 1,3,5)")
     parser.add_argument('--all', action='store_true', help="If set, show all layers from 1 to P")
     parser.add_argument('--mode', choices=['auto', 'manual'], default='auto', help="Direction mode")
     parser.add_argument('--h', type=float, default=1.0, help="Step size to use if h_list not provided")
     parser.add_argument('--hlist', type=str, help="Comma-separated list of step sizes for each order")
+    parser.add_argument('--directions', type=str, default='coordinate',
+                        help="Direction set in auto mode (coordinate, regular_simplex, minimal_positive_basis, orthogonal, symmetric)")
+    parser.add_argument('--scheme', choices=['forward', 'centered'], default='forward',
+                        help="Difference scheme (centered is second-order accurate in h)")
     args = parser.parse_args()
+    if not args.expr and not args.benchmark:
+        parser.error("one of --expr or --benchmark is required")
+    if not args.x0 and not (args.benchmark and args.n):
+        parser.error("--x0 is required (or --benchmark with --n)")
 
     f_expr = args.expr
-    x0 = tuple(map(float, args.x0.split(',')))
+    x0 = tuple(map(float, args.x0.split(','))) if args.x0 else None
     P = args.order
     custom_layers = list(map(int, args.layers.split(','))) if args.layers else None
 
@@ -104,7 +127,11 @@ def main():
         show_all=args.all,
         custom_layers=custom_layers,
         h=args.h,
-        h_list=h_list
+        h_list=h_list,
+        benchmark=args.benchmark,
+        n=args.n,
+        scheme=args.scheme,
+        directions=args.directions
     )
 
 if __name__ == '__main__':
@@ -2,7 +2,9 @@ import numpy as np
 import sympy as sp
 import argparse
 import sys
-from gsg import gsg_from_func, gsg_from_values, gsg_error_bound, gsg_error_bound_lipschitz
+from gsg import gsg_from_func, gsg_from_values, gsg_error_bound, gsg_error_bound_lipschitz, gsg_error_bound_table, hessian_norms
+from benchmarks import get_benchmark, benchmark_point
+from directions import get_direction_set
 
 def run_interactive_mode():
     print("Interactive GSG Tester Mode\n")
@@ -45,6 +47,12 @@ Options:
   --h           Step size (e.g., 0.01)
   --S           Direction matrix S in row format (e.g., "0.01 0; 0 0.01")
   --values      Function values: f(x0), f(x0+s1), ..., (e.g., "14.0, 14.0201, 14.1303")
+  --benchmark   Built-in test function instead of --function (rosenbrock, quartic,
+                trigonometric, powell, quadratic); uses closed-form derivatives
+  --n           Dimension for --benchmark (x0 defaults to the standard starting point;
+                a single --x0 value is repeated n times)
+  --directions  Direction set from directions.py: coordinate (default), regular_simplex,
+                minimal_positive_basis, orthogonal, symmetric
   --manual      Use function-value mode instead of symbolic
   --interactive Run with prompts (for beginners)
   --help        Show this help message and exit
@@ -58,6 +66,7 @@ Manual Mode Hint:
 Examples:
   python testgsg.py --x0 1 2 --function "x0**2 * x1 + 3*x1**2" --h 0.01
   python testgsg.py --manual --x0 1 2 --S "0.01 0; 0 0.01" --values "14.0, 14.0201, 14.1303"
+  python testgsg.py --benchmark rosenbrock --n 1000 --h 1e-6
 """)
         sys.exit()
 
@@ -67,6 +76,9 @@ Examples:
     parser.add_argument("--h", type=float)
     parser.add_argument("--S", type=str)
     parser.add_argument("--values", type=str)
+    parser.add_argument("--benchmark", type=str)
+    parser.add_argument("--n", type=int)
+    parser.add_argument("--directions", type=str, default="coordinate")
     parser.add_argument("--manual", action="store_true")
     parser.add_argument("--interactive", action="store_true")
     args = parser.parse_args()
@@ -85,15 +97,39 @@ Examples:
         grad = gsg_from_values(v, S)
         print("Approximate gradient (GSG):", grad)
 
+    elif args.benchmark and args.h:
+        bench = get_benchmark(args.benchmark)
+        x0 = benchmark_point(bench, args.n, args.x0)
+        h = args.h
+        n = len(x0)
+        print(f"\nUsing benchmark '{bench.name}' (n = {n}) and '{args.directions}' directions:")
+        S = get_direction_set(args.directions, n).S
+
+        grad = gsg_from_func(bench.f, x0, S, h, vectorized=True)
+        print("Approximate gradient (GSG):", grad)
+
+        grad_true = bench.grad(*x0)
+        print("True gradient:", grad_true)
+
+        abs_error = np.abs(grad - grad_true)
+        print("Max Absolute Error:", np.max(abs_error))
+
+        lipschitz_L = hessian_norms(x0[None, :], bench.hess)[0]
+        print("Estimated Lipschitz constant L:", lipschitz_L)
+
+        bound = gsg_error_bound_table(x0[None, :], S, [h], L=lipschitz_L)[0, 0]
+        print("Lipschitz-based error bound:", bound)
+
     elif args.function and args.x0 and args.h:
-        print("\nUsing symbolic function and standard basis:")
+        basis = "standard basis" if args.directions == "coordinate" else f"'{args.directions}' directions"
+        print(f"\nUsing symbolic function and {basis}:")
         x0 = np.array(args.x0)
         h = args.h
         n = len(x0)
         x_syms = sp.symbols(f'x0:{n}')
         f_expr = sp.sympify(args.function)
         f_func = sp.lambdify(x_syms, f_expr, "numpy")
-        S = np.eye(n)  # Normalized
+        S = get_direction_set(args.directions, n).S  # Normalized
 
         grad = gsg_from_func(f_func, x0, S, h)
         print("S matrix:\n", S)
@@ -109,11 +145,10 @@ Examples:
 
         H = sp.hessian(f_expr, x_syms)
         hess_func = sp.lambdify(x_syms, H, "numpy")
-        H_at_x0 = np.array(hess_func(*x0), dtype=float)
-        lipschitz_L = np.max(np.abs(np.linalg.eigvals(H_at_x0)))
+        lipschitz_L = hessian_norms(x0[None, :], hess_func)[0]
         print("Estimated Lipschitz constant L:", lipschitz_L)
 
-        bound = gsg_error_bound_lipschitz(n, h, lipschitz_L)
+        bound = gsg_error_bound_table(x0[None, :], S, [h], L=lipschitz_L)[0, 0]
         print("Lipschitz-based error bound:", bound)
 
     else:
@@ -3,6 +3,8 @@ import sympy as sp
 import argparse
 import sys
 from gsh import gsh_from_func, gsh_from_values, gsh_error_bound
+from benchmarks import get_benchmark, benchmark_point
+from directions import get_direction_set
 
 def run_interactive_mode():
     print("Interactive GSH Tester Mode\n")
@@ -15,7 +17,7 @@ def run_interactive_mode():
     f_func = sp.lambdify(x_syms, f_expr, "numpy")
 
     S = np.eye(n)
-    hess = gsh_from_func(f_func, x0, S, h)
+    hess = gsh_from_func(f_func, x0, S, S, h)
     print("\nApproximate Hessian (GSH):", hess)
 
     hess_expr = sp.hessian(f_expr, x_syms)
@@ -27,7 +29,7 @@ def run_interactive_mode():
     print("Max Absolute Error:", np.max(abs_error))
 
     L = float(input("Enter estimated Lipschitz constant L (or guess): "))
-    bound = gsh_error_bound(n, h, L)
+    bound = gsh_error_bound(n, n, L, h)
     print("Lipschitz-based error bound:", bound)
 
 def parse_matrix(matrix_str):
@@ -45,6 +47,12 @@ Options:
   --h           Step size (e.g., 0.01)
   --S           Direction matrix S in row format (e.g., "0.01 0; 0 0.01")
   --values      Function values: f(x0), f(x0+s1), ..., f(x0+si+sj) (e.g., "14.0, 14.0201, 14.1303, 14.170601")
+  --benchmark   Built-in test function instead of --function (rosenbrock, quartic,
+                trigonometric, powell, quadratic); uses closed-form derivatives
+  --n           Dimension for --benchmark (x0 defaults to the standard starting point;
+                a single --x0 value is repeated n times)
+  --directions  Direction set from directions.py: coordinate (default), regular_simplex,
+                minimal_positive_basis, orthogonal, symmetric
   --manual      Use function-value mode instead of symbolic
   --interactive Run with prompts (for beginners)
   --help        Show this help message and exit
@@ -54,6 +62,10 @@ Manual Mode Hint:
   - --values "v0,v1,...,vm,v(m+1),..." provides values: v0 = f(x0), v1 = f(x0 + S[:,0]), ..., vm = f(x0 + S[:,m-1]), followed by f(x0 + S[:,i] + S[:,j]) for all i ≤ j.
   Example for f(x0, x1) = x0^2 * x1 + 3*x1^2 at x0 = [1, 2], h = 0.01:
     python testgsh.py --manual --x0 1 2 --S "0.01 0; 0 0.01" --values "14.0, 14.0201, 14.1303, 14.170601"
+
+Examples:
+  python testgsh.py --x0 1 2 --function "x0**2 * x1 + 3*x1**2" --h 0.01
+  python testgsh.py --benchmark trigonometric --n 50 --h 1e-4
 """)
         sys.exit()
 
@@ -63,6 +75,9 @@ Manual Mode Hint:
     parser.add_argument("--h", type=float)
     parser.add_argument("--S", type=str)
     parser.add_argument("--values", type=str)
+    parser.add_argument("--benchmark", type=str)
+    parser.add_argument("--n", type=int)
+    parser.add_argument("--directions", type=str, default="coordinate")
     parser.add_argument("--manual", action="store_true")
     parser.add_argument("--interactive", action="store_true")
     args = parser.parse_args()
@@ -81,17 +96,41 @@ Manual Mode Hint:
         hess = gsh_from_values(v, S)
         print("Approximate Hessian (GSH):", hess)
 
+    elif args.benchmark and args.h:
+        bench = get_benchmark(args.benchmark)
+        x0 = benchmark_point(bench, args.n, args.x0)
+        h = args.h
+        n = len(x0)
+        print(f"\nUsing benchmark '{bench.name}' (n = {n}) and '{args.directions}' directions:")
+        S = get_direction_set(args.directions, n).S
+
+        hess = gsh_from_func(bench.f, x0, S, S, h, vectorized=True)
+        print("Approximate Hessian (GSH):", hess)
+
+        hess_true = bench.hess(*x0)
+        print("True Hessian:", hess_true)
+
+        abs_error = np.abs(hess - hess_true)
+        print("Max Absolute Error:", np.max(abs_error))
+
+        L = bench.third_max(*x0)  # from the sparse structure, no dense n^3 tensor
+        print("Estimated Lipschitz constant L:", L)
+        m = S.shape[1]
+        bound = gsh_error_bound(m, m, L, h)
+        print("Lipschitz-based error bound:", bound)
+
     elif args.function and args.x0 and args.h:
-        print("\nUsing symbolic function and standard basis:")
+        basis = "standard basis" if args.directions == "coordinate" else f"'{args.directions}' directions"
+        print(f"\nUsing symbolic function and {basis}:")
         x0 = np.array(args.x0)
         h = args.h
         n = len(x0)
         x_syms = sp.symbols(f'x0:{n}')
         f_expr = sp.sympify(args.function)
         f_func = sp.lambdify(x_syms, f_expr, "numpy")
-        S = np.eye(n)  # Normalized
+        S = get_direction_set(args.directions, n).S  # Normalized
 
-        hess = gsh_from_func(f_func, x0, S, h)
+        hess = gsh_from_func(f_func, x0, S, S, h)
         print("S matrix:\n", S)
         print("Approximate Hessian (GSH):", hess)
 
@@ -105,7 +144,8 @@ Manual Mode Hint:
 
         L = np.max(np.abs(np.linalg.eigvals(hess_true)))
         print("Estimated Lipschitz constant L:", L)
-        bound = gsh_error_bound(n, h, L)
+        m = S.shape[1]
+        bound = gsh_error_bound(m, m, L, h)
         print("Lipschitz-based error bound:", bound)
 
     else:
@@ -2,6 +2,12 @@ import numpy as np
 import sympy as sp
 import argparse
 from tres import gst_from_func, gst_error_bound, estimate_lipschitz_tressian_from_symbolic
+from benchmarks import get_benchmark, benchmark_point
+from directions import get_direction_set
+
+# Benchmark mode estimates the Tressian's Lipschitz constant from m + 1 dense
+# closed-form Tressians only while they stay this small (n^3 m entries)
+DENSE_LIPSCHITZ_MAX_ENTRIES = 50_000_000
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -9,21 +15,26 @@ def parse_args():
     )
     parser.add_argument("--x0", nargs="+", type=float, help="Base point x0 (space-separated list)")
     parser.add_argument("--function", type=str, help="Function expression in terms of x0, x1, ...")
+    parser.add_argument("--benchmark", type=str,
+                        help="Built-in test function (rosenbrock, quartic, trigonometric, powell, quadratic)")
+    parser.add_argument("--n", type=int, help="Dimension for --benchmark (x0 defaults to its standard point)")
+    parser.add_argument("--directions", type=str, default="coordinate",
+                        help="Direction set for S, T, U (coordinate, regular_simplex, minimal_positive_basis, "
+                             "orthogonal, symmetric)")
     parser.add_argument("--h", type=float, help="Step size h")
     parser.add_argument("--interactive", action="store_true", help="Run in interactive mode")
     parser.add_argument("--manual", action="store_true", help="Use manual value-only mode")
     return parser.parse_args()
 
-def run_symbolic_mode(x0, f_expr_str, h):
+def run_symbolic_mode(x0, f_expr_str, h, directions="coordinate"):
     n = len(x0)
     x_syms = sp.symbols(f"x0:{n}")
     f_expr = sp.sympify(f_expr_str)
     f_func = sp.lambdify(x_syms, f_expr, "numpy")
 
     # Normalized directions
-    S = np.eye(n)
-    T = np.eye(n)
-    U = np.eye(n)
+    S = T = U = get_direction_set(directions, n).S
+    m = S.shape[1]
 
     print("\nNormalized S, T, U direction matrices:\n", S)
 
@@ -44,7 +55,32 @@ def run_symbolic_mode(x0, f_expr_str, h):
     lipschitz_func = estimate_lipschitz_tressian_from_symbolic(x_syms, f_expr)
     L_tress = lipschitz_func(*x0)
     print("\nEstimated Lipschitz constant for Tressian at x0:", L_tress)
-    bound = gst_error_bound(n, n, n, L_tress, h)
+    bound = gst_error_bound(m, m, m, L_tress, h)
+    print("Tressian error bound (auto-estimated L):", bound)
+
+def run_benchmark_mode(name, n, x0, h, directions="coordinate"):
+    bench = get_benchmark(name)
+    x0 = benchmark_point(bench, n, x0)
+    n = len(x0)
+    print(f"\nUsing benchmark '{bench.name}' (n = {n}) with '{directions}' S, T, U.")
+    S = get_direction_set(directions, n).S
+    m = S.shape[1]
+
+    T_est = gst_from_func(bench.f, x0, S, S, S, h, vectorized=True)
+    print("\nEstimated third-order tensor (Tressian):\n", T_est)
+
+    third_true = bench.third(*x0)
+    print("\nTrue Tressian at x0:\n", third_true)
+    print("\nMax absolute error:", np.max(np.abs(T_est - third_true)))
+
+    # Lipschitz estimate from differences of the closed-form Tressian along S: m more
+    # dense n^3 tensors, so it is skipped for large n
+    if n * n * n * m > DENSE_LIPSCHITZ_MAX_ENTRIES:
+        print(f"\nTressian error bound skipped for n = {n} (needs {m} more dense n^3 Tressians).")
+        return
+    L_tress = max(np.max(np.abs(bench.third(*(x0 + h * S[:, i])) - third_true)) / h for i in range(m))
+    print("\nEstimated Lipschitz constant for Tressian at x0:", L_tress)
+    bound = gst_error_bound(m, m, m, L_tress, h)
     print("Tressian error bound (auto-estimated L):", bound)
 
 def run_interactive():
@@ -62,9 +98,11 @@ def main():
         run_interactive()
         return
 
-    if args.x0 and args.function and args.h:
+    if args.benchmark and args.h:
+        run_benchmark_mode(args.benchmark, args.n, args.x0, args.h, args.directions)
+    elif args.x0 and args.function and args.h:
         x0 = np.array(args.x0)
-        run_symbolic_mode(x0, args.function, args.h)
+        run_symbolic_mode(x0, args.function, args.h, args.directions)
     else:
         print("\n[!] Missing required arguments. Use --interactive for guided mode or see --help for CLI usage.")
 
@@ -1,7 +1,11 @@
 import numpy as np
-import sympy as sp
+import os
+from stencil import (pinv_t, lattice_values, output_array, default_chunk_size, contract_t, second_difference,
+                     scratch_file)
+from directions import as_direction_matrix
 
-def gst_from_func(fun, x0, S, T, U, h=0.01):
+def gst_from_func(fun, x0, S, T, U, h=0.01, vectorized=False, workers=None, out=None, chunk_size=None,
+                  solver="pinv", return_info=False):
     """
     Compute the Generalized Simplex Tressian (GST) from a function.
 
@@ -11,69 +15,150 @@ def gst_from_func(fun, x0, S, T, U, h=0.01):
         x0 : ndarray (n,)
             Base point
         S, T, U : ndarray (n, m), (n, k), (n, l)
-            Normalized direction matrices (columns have norm 1)
+            Normalized direction matrices (columns have norm 1), or names of
+            sets from directions.DIRECTION_SETS
         h : float, optional
             Step size (default 0.01)
+        vectorized : bool, optional
+            Call fun once per batch of points with array coordinates (default False)
+        workers : int or None, optional
+            Number of worker processes for the evaluations (default in-process)
+        out : None, str or ndarray, optional
+            Out-of-core mode: path of a .npy file (or an array such as an np.memmap)
+            receiving the Tressian. The value grid is then kept in a temporary
+            memory-mapped file next to it and the contraction runs in chunks
+        chunk_size : int or None, optional
+            Rows of the leading index per chunk (default: about 64 MB per chunk)
+        solver : str, optional
+            Least-squares backend for S, T and U: "pinv" (default), "lstsq",
+            "cholesky", "svd" or "auto", see stencil.solve_t (in-memory mode only)
+        return_info : bool, optional
+            Also return the solver report (per-axis solver, cond, residual)
+    Returns:
+        Tressian approximation: ndarray (n, n, n), an np.memmap when out is a path
+        info : dict, only with return_info=True
+    """
+    x0 = np.asarray(x0, dtype=float)
+    S = as_direction_matrix(S, len(x0))
+    T = as_direction_matrix(T, len(x0))
+    U = as_direction_matrix(U, len(x0))
+
+    if out is None and chunk_size is None:
+        # Every lattice point x0 + h(s_i, t_j, u_r subsets) is evaluated once
+        v = lattice_values(fun, x0, [S, T, U], h, vectorized=vectorized, workers=workers)
+        delta = _third_difference(v) / (h**3)
+        return _contract(delta, S, T, U, solver, return_info)
+
+    _check_chunked_solver(solver, return_info)
+    with scratch_file(out) as values_path:
+        v = lattice_values(fun, x0, [S, T, U], h, vectorized=vectorized, workers=workers, out=values_path)
+        Tressian = _contract_chunked(v, S, T, U, 1.0 / h**3, out, chunk_size)
+        del v
+    return Tressian
+
+def gst_from_grad(grad, x0, S, T, U=None, h=0.01, vectorized=False, workers=None):
+    """
+    Compute the GST from a gradient oracle using (m+1)(k+1) gradient evaluations.
+
+    Parameters:
+        grad : callable
+            Gradient of f, called as grad(*x), returning a vector in R^n
+        x0 : ndarray (n,)
+            Base point
+        S, T : ndarray (n, m), (n, k)
+            Normalized direction matrices (columns have norm 1), or names of
+            sets from directions.DIRECTION_SETS
+        U : ndarray (n, l) or None, optional
+            Direction matrix for the innermost order; the exact gradient replaces
+            the simplex gradient along U, so U only projects onto its span
+            (default None, no projection)
+        h : float, optional
+            Step size (default 0.01)
+        vectorized, workers : see gst_from_func
     Returns:
         Tressian approximation: ndarray (n, n, n)
     """
     x0 = np.asarray(x0, dtype=float)
-    S = np.asarray(S, dtype=float)
-    T = np.asarray(T, dtype=float)
-    U = np.asarray(U, dtype=float)
-    
-    m, k, l = S.shape[1], T.shape[1], U.shape[1]
-    
-    # Build delta tensor
-    delta = np.zeros((m, k, l))
-    for i in range(m):
-        for j in range(k):
-            for r in range(l):
-                f111 = fun(*(x0 + h * S[:, i] + h * T[:, j] + h * U[:, r]))
-                f100 = fun(*(x0 + h * S[:, i]))
-                f010 = fun(*(x0 + h * T[:, j]))
-                f001 = fun(*(x0 + h * U[:, r]))
-                f110 = fun(*(x0 + h * S[:, i] + h * T[:, j]))
-                f101 = fun(*(x0 + h * S[:, i] + h * U[:, r]))
-                f011 = fun(*(x0 + h * T[:, j] + h * U[:, r]))
-                f000 = fun(*x0)
-                
-                delta[i, j, r] = (
-                    f111 - f110 - f101 - f011 + f100 + f010 + f001 - f000
-                ) / (h**3)
-
-    S_pinv = np.linalg.pinv(S.T)
-    T_pinv = np.linalg.pinv(T.T)
-    U_pinv = np.linalg.pinv(U.T)
-
-    Tressian = np.einsum('ia,jb,kc,ijk->abc', S_pinv, T_pinv, U_pinv, delta)
+    S = as_direction_matrix(S, len(x0))
+    T = as_direction_matrix(T, len(x0))
+
+    g = lattice_values(grad, x0, [S, T], h, vectorized=vectorized, workers=workers)
+    delta = second_difference(g) / (h**2)  # (m, k, n)
+    if U is not None:
+        U = as_direction_matrix(U, len(x0))
+        delta = delta @ U @ pinv_t(U).T
+
+    Tressian = contract_t(delta, [S, T])  # the gradient axis c is kept
     return Tressian
 
-def gst_from_values(v, S, T, U):
+def gst_from_values(v, S, T, U, out=None, chunk_size=None, solver="pinv", return_info=False):
     """
     Compute the GST using pre-evaluated function values.
 
     Parameters:
-        v : ndarray of shape (m+1, k+1, l+1)
-            v[i,j,r] = f(x0 + s_i + t_j + u_r), with appropriate special cases
+        v : ndarray of shape (m+1, k+1, l+1), or path of a .npy file
+            v[i,j,r] = f(x0 + s_i + t_j + u_r), with appropriate special cases.
+            Memory-mapped arrays (and paths, opened with mmap_mode="r") are read
+            chunk by chunk when out or chunk_size is given
         S, T, U : ndarray (n, m), (n, k), (n, l)
             Direction matrices
+        out : None, str or ndarray, optional
+            Out-of-core mode: path of a .npy file (or an array such as an np.memmap)
+            receiving the Tressian, computed in chunks of the leading index
+        chunk_size : int or None, optional
+            Rows of the leading index per chunk (default: about 64 MB per chunk)
+        solver, return_info : see gst_from_func
     Returns:
-        Tressian estimate: ndarray (n, n, n)
+        Tressian estimate: ndarray (n, n, n), an np.memmap when out is a path
+        info : dict, only with return_info=True
     """
+    if isinstance(v, (str, os.PathLike)):
+        v = np.load(v, mmap_mode="r")
+    if out is not None or chunk_size is not None:
+        _check_chunked_solver(solver, return_info)
+        return _contract_chunked(v, S, T, U, 1.0, out, chunk_size)
+
     v = np.asarray(v, dtype=float)
-    m, k, l = S.shape[1], T.shape[1], U.shape[1]
+    delta = _third_difference(v)
+    return _contract(delta, S, T, U, solver, return_info)
+
+def _contract(delta, S, T, U, solver, return_info):
+    # One axis at a time: O(n m k l) instead of the naive four-operand einsum
+    return contract_t(delta, [np.asarray(M, dtype=float) for M in (S, T, U)], solver, return_info)
 
-    delta = (
+def _check_chunked_solver(solver, return_info):
+    # The chunked contraction reads rows of the explicit pseudo-inverses
+    if solver != "pinv" or return_info:
+        raise ValueError("out/chunk_size support only solver='pinv' without return_info")
+
+def _third_difference(v):
+    # Mixed forward difference over the three lattice axes
+    return (
         v[1:,1:,1:] - v[1:,1:,0:1] - v[1:,0:1,1:] - v[0:1,1:,1:]
-        + v[1:,0:1,0:1] + v[0:1,1:,0:1] + v[0:1,0:1,1:] - v[0,0,0]
+        + v[1:,0:1,0:1] + v[0:1,1:,0:1] + v[0:1,0:1,1:] - v[0:1,0:1,0:1]
     )
 
-    S_pinv = np.linalg.pinv(S.T)
-    T_pinv = np.linalg.pinv(T.T)
-    U_pinv = np.linalg.pinv(U.T)
+def _contract_chunked(v, S, T, U, scale, out, chunk_size):
+    # Tressian[a] = scale * sum_i S_pinv[a, i] (delta[i] contracted with T_pinv, U_pinv),
+    # built for a block of rows a at a time, reading delta for a block of rows i at
+    # a time, so only O(chunk_size * max(n, k, l)^2) floats are held in memory.
+    S_pinv, T_pinv, U_pinv = pinv_t(S), pinv_t(T), pinv_t(U)
+    n, m = S_pinv.shape
+    if chunk_size is None:
+        chunk_size = default_chunk_size(max(T_pinv.shape[0] * U_pinv.shape[0], v.shape[1] * v.shape[2]))
 
-    Tressian = np.einsum('ia,jb,kc,ijk->abc', S_pinv, T_pinv, U_pinv, delta)
+    Tressian = output_array(out, (n, T_pinv.shape[0], U_pinv.shape[0]))
+    base = np.asarray(v[0:1], dtype=float)
+    for a0 in range(0, n, chunk_size):
+        a1 = min(a0 + chunk_size, n)
+        acc = 0.0
+        for i0 in range(0, m, chunk_size):
+            i1 = min(i0 + chunk_size, m)
+            delta = _third_difference(np.concatenate([base, np.asarray(v[i0 + 1:i1 + 1], dtype=float)]))
+            acc = acc + np.tensordot(S_pinv[a0:a1, i0:i1], delta, axes=1)
+        Tressian[a0:a1] = scale * np.einsum('bj,ck,ajk->abc', T_pinv, U_pinv, acc, optimize=True)
+    if isinstance(Tressian, np.memmap):
+        Tressian.flush()
     return Tressian
 
 def gst_error_bound(m, k, l, L_tress, h):
@@ -96,6 +181,8 @@ def estimate_lipschitz_tressian_from_symbolic(x_syms, f_expr):
     """
     Estimate the Lipschitz constant of the third derivative (Tressian) using max of 4th-order derivatives.
     """
+    import sympy as sp
+
     n = len(x_syms)
     fourth_derivs = []
     for i in range(n):